@@ -0,0 +1,152 @@
+from typing import Iterator, List, Optional, Tuple
+
+# Layer III bitrates in kbps, indexed by the 4-bit bitrate index
+MPEG1_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+MPEG2_BITRATES = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+
+# Sample rates indexed by [version bits][sample rate index]
+SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],  # MPEG 1
+    0b10: [22050, 24000, 16000],  # MPEG 2
+    0b00: [11025, 12000, 8000],   # MPEG 2.5
+}
+
+def parse_frame_header(data: bytes, offset: int) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Parse an MPEG audio Layer III frame header.
+
+    Returns:
+        Optional[Tuple[int, int, int, int]]: (frame_length, sample_rate, channels, samples_per_frame),
+        or None if there is no valid header at offset
+    """
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0b11
+    layer = (b1 >> 1) & 0b11
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0b11
+    if version not in SAMPLE_RATES or layer != 0b01 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    padding = (b2 >> 1) & 1
+    channels = 1 if (b3 >> 6) == 0b11 else 2
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    if version == 0b11:
+        bitrate = MPEG1_BITRATES[bitrate_index] * 1000
+        frame_length = 144 * bitrate // sample_rate + padding
+        samples_per_frame = 1152
+    else:
+        bitrate = MPEG2_BITRATES[bitrate_index] * 1000
+        frame_length = 72 * bitrate // sample_rate + padding
+        samples_per_frame = 576
+    return frame_length, sample_rate, channels, samples_per_frame
+
+def side_info_length(sample_rate: int, channels: int) -> int:
+    """Size of the Layer III side information that follows the 4-byte header"""
+    if sample_rate in SAMPLE_RATES[0b11]:
+        return 17 if channels == 1 else 32
+    return 9 if channels == 1 else 17
+
+def skip_id3v2(data: bytes) -> int:
+    """Return the offset of the first byte after a leading ID3v2 tag"""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        # Syncsafe integer: 7 bits per byte
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+def iter_mp3_frames(data: bytes) -> Iterator[Tuple[bytes, Tuple[int, int, int, int]]]:
+    """
+    Yield (frame, header_info) for every audio frame in an MP3 byte string.
+    Tags and Xing/Info/VBRI frames are skipped; they describe a single file and
+    would give players the wrong duration once files are concatenated.
+    """
+    offset = skip_id3v2(data)
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)
+    while offset < end:
+        info = parse_frame_header(data, offset)
+        if info is None or offset + info[0] > end:
+            # Resynchronize on the next possible frame sync
+            next_sync = data.find(b"\xff", offset + 1)
+            offset = next_sync if next_sync != -1 else end
+            continue
+        frame_length, sample_rate, channels, _ = info
+        frame = data[offset:offset + frame_length]
+        offset += frame_length
+
+        tag_offset = 4 + side_info_length(sample_rate, channels)
+        if frame[tag_offset:tag_offset + 4] in (b"Xing", b"Info") or frame[36:40] == b"VBRI":
+            continue
+        yield frame, info
+
+def silent_frame(sample_rate: int, channels: int) -> bytes:
+    """
+    Build one Layer III frame that decodes to silence.
+    An all-zero side information block declares no coded audio data, so every
+    sample in the frame decodes to zero.
+    """
+    for version, rates in SAMPLE_RATES.items():
+        if sample_rate in rates:
+            break
+    else:
+        raise ValueError(f"Unsupported MP3 sample rate: {sample_rate}")
+
+    # Lowest bitrate keeps silence small: 32 kbps for MPEG 1, 8 kbps otherwise
+    bitrate_index = 1
+    header = bytes([
+        0xFF,
+        0xE0 | (version << 3) | (0b01 << 1) | 1,  # sync, version, Layer III, no CRC
+        (bitrate_index << 4) | (rates.index(sample_rate) << 2),  # no padding
+        (0b11 if channels == 1 else 0b00) << 6  # mono or stereo
+    ])
+    frame_length = parse_frame_header(header, 0)[0]
+    return header + bytes(frame_length - 4)
+
+def silence_bytes(duration_ms: int, sample_rate: int = 24000, channels: int = 1) -> bytes:
+    """Return enough silent frames to cover duration_ms"""
+    samples_per_frame = 1152 if sample_rate in SAMPLE_RATES[0b11] else 576
+    count = max(1, round(duration_ms / 1000 * sample_rate / samples_per_frame))
+    return silent_frame(sample_rate, channels) * count
+
+class Mp3Assembler:
+    def __init__(self, sample_rate: int = 24000, channels: int = 1):
+        """
+        Concatenate MP3 audio and generated silence in memory.
+
+        Args:
+            sample_rate (int): Stream format used for silence until real audio is appended
+            channels (int): Channel count used for silence until real audio is appended
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._chunks: List[bytes] = []
+        self._format_known = False
+
+    def append_bytes(self, data: bytes):
+        """Append the audio frames of an MP3 byte string"""
+        frames = []
+        for frame, (_, sample_rate, channels, _) in iter_mp3_frames(data):
+            if not self._format_known:
+                # Match silence to the real stream so decoders never see a format switch
+                self.sample_rate, self.channels = sample_rate, channels
+                self._format_known = True
+            frames.append(frame)
+        self._chunks.append(b"".join(frames))
+
+    def append_file(self, path: str):
+        """Append the audio frames of an MP3 file"""
+        with open(path, 'rb') as f:
+            self.append_bytes(f.read())
+
+    def append_silence(self, duration_ms: int):
+        """Append silence of roughly the given duration, rounded to whole frames"""
+        self._chunks.append(silence_bytes(duration_ms, self.sample_rate, self.channels))
+
+    def to_bytes(self) -> bytes:
+        """Return the assembled stream"""
+        return b"".join(self._chunks)
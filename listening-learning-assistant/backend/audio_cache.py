@@ -0,0 +1,102 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+class AudioSegmentCache:
+    def __init__(self, directory: str, max_bytes: int = 500 * 1024 * 1024):
+        """
+        Initialize a persistent, content-addressed cache of synthesized speech
+
+        Args:
+            directory (str): Where cached segments are stored
+            max_bytes (int): Least recently used segments are evicted above this total size
+        """
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def make_key(text: str, voice: str, engine: str, output_format: str) -> str:
+        """Hash everything that changes the synthesized audio"""
+        payload = "\0".join([text, voice, engine, output_format])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str, output_format: str) -> str:
+        """Return the file a segment is stored in, sharded to keep directories small"""
+        return os.path.join(self.directory, key[:2], f"{key}.{output_format}")
+
+    def contains(self, path: str) -> bool:
+        """Check whether a file is managed by this cache"""
+        return os.path.abspath(path).startswith(self.directory + os.sep)
+
+    def get(self, text: str, voice: str, engine: str, output_format: str) -> Optional[str]:
+        """Return the path of a cached segment, or None"""
+        path = self.path_for(self.make_key(text, voice, engine, output_format), output_format)
+        with self._lock:
+            if os.path.exists(path):
+                self.hits += 1
+                # The modification time doubles as the LRU timestamp
+                os.utime(path)
+                return path
+            self.misses += 1
+            return None
+
+    def put(self, text: str, voice: str, engine: str, output_format: str, data: bytes) -> str:
+        """Store a synthesized segment and return its path"""
+        path = self.path_for(self.make_key(text, voice, engine, output_format), output_format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file in the same directory and rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+            self._total_bytes += len(data) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return path
+
+    def _scan(self):
+        """Yield (path, size, mtime) for every cached segment"""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        """Delete least recently used segments until the cache is back under 90% of its limit"""
+        target = int(self.max_bytes * 0.9)
+        for path, size, _ in sorted(self._scan(), key=lambda entry: entry[2]):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.unlink(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for this process and the current cache size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes
+        }
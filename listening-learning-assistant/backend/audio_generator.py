@@ -1,16 +1,58 @@
-import boto3
+import asyncio
+import hashlib
 import json
 import os
-from typing import Dict, List, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 import tempfile
-import subprocess
-from datetime import datetime
+from backend.audio_assembly import Mp3Assembler
+from backend.audio_cache import AudioSegmentCache
+from backend.bedrock_client import get_bedrock_client, get_polly_client, get_rate_limiter, run_blocking
+from backend.conversation_parser import conversation_parts_error, parse_question_locally
+from backend.question_schema import without_answer_key
+from backend.metrics import StageMetrics
+from backend.rate_limit import TokenBucket
+
+# Bump when the pause layout or part ordering changes, so cached question audio is regenerated
+AUDIO_LAYOUT_VERSION = "2"
 
 class AudioGenerator:
-    def __init__(self):
-        self.bedrock = boto3.client('bedrock-runtime', region_name="us-east-1")
-        self.polly = boto3.client('polly', region_name="us-east-1")
+    def __init__(
+        self,
+        max_workers: int = 4,
+        segment_cache_bytes: int = 500 * 1024 * 1024,
+        polly_rate_limiter: Optional[TokenBucket] = None,
+        bedrock_rate_limiter: Optional[TokenBucket] = None,
+        metrics: Optional[StageMetrics] = None,
+        audio_dir: Optional[str] = None,
+        segment_cache_dir: Optional[str] = None
+    ):
+        """
+        Initialize the generator on the shared Bedrock and Polly clients.
+        Conversation parts are synthesized concurrently by up to max_workers
+        Polly requests, which botocore retries on throttling and server errors. Synthesized
+        segments are cached on disk, so repeated phrases never reach Polly.
+        Optional token buckets cap the request rate to each service, e.g. when
+        several generators share one account quota. Pipeline stages are timed
+        on metrics, which batch tools can share across generators to aggregate.
+        audio_dir and segment_cache_dir default to the app's static audio and the backend cache.
+        """
+        self.max_workers = max(1, max_workers)
+        # Without an explicit limiter, share the process-wide Polly quota
+        self.polly_rate_limiter = polly_rate_limiter or get_rate_limiter('polly', 'synthesize_speech')
+        self.bedrock_rate_limiter = bedrock_rate_limiter
+        self.metrics = metrics or StageMetrics("audio_generator")
+        self.bedrock = get_bedrock_client()
+        self.polly = get_polly_client()
         self.model_id = "amazon.nova-micro-v1:0"
+        self.parse_stats = {'local': 0, 'llm': 0}
+        self._parse_lock = threading.Lock()
+        self.polly_engine = 'neural'
+        self.output_format = 'mp3'
+        # Pinned so generated silence always matches the speech stream
+        self.sample_rate = 24000
         
         # Define Arabic voices by gender
         self.voices = {
@@ -20,32 +62,28 @@ class AudioGenerator:
         }
         
         # Create audio output directory
-        self.audio_dir = os.path.join(
+        self.audio_dir = os.path.abspath(audio_dir) if audio_dir else os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             "frontend/static/audio"
         )
         os.makedirs(self.audio_dir, exist_ok=True)
+        
+        # Announcer lines and common phrases repeat across questions
+        self.segment_cache = AudioSegmentCache(
+            segment_cache_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "audio_cache"),
+            max_bytes=segment_cache_bytes
+        )
 
     def _invoke_bedrock(self, prompt: str) -> str:
         """Invoke Bedrock with the given prompt using converse API"""
-        messages = [{
-            "role": "user",
-            "content": [{
-                "text": prompt
-            }]
-        }]
-        
         try:
-            response = self.bedrock.converse(
-                modelId=self.model_id,
-                messages=messages,
-                inferenceConfig={
-                    "temperature": 0.3,
-                    "topP": 0.95,
-                    "maxTokens": 2000
-                }
-            )
-            return response['output']['message']['content'][0]['text']
+            if self.bedrock_rate_limiter:
+                self.metrics.observe("bedrock_rate_limit_wait", self.bedrock_rate_limiter.acquire())
+            return self.bedrock.converse_text(self.model_id, prompt, {
+                "temperature": 0.3,
+                "topP": 0.95,
+                "maxTokens": 2000
+            })
         except Exception as e:
             print(f"Error in Bedrock converse: {str(e)}")
             raise e
@@ -55,153 +93,161 @@ class AudioGenerator:
         Validate that the conversation parts are properly formatted.
         Returns True if valid, False otherwise.
         """
-        if not parts:
-            print("Error: No conversation parts generated")
+        error = conversation_parts_error(parts)
+        if error:
+            print(f"Error: {error}")
             return False
-            
-        # Check that we have an announcer for intro
-        if not parts[0][0].lower() == 'announcer':
-            print("Error: First speaker must be Announcer")
-            return False
-            
-        # Check that each part has valid content
-        for i, (speaker, text, gender) in enumerate(parts):
-            # Check speaker
-            if not speaker or not isinstance(speaker, str):
-                print(f"Error: Invalid speaker in part {i+1}")
-                return False
-                
-            # Check text
-            if not text or not isinstance(text, str):
-                print(f"Error: Invalid text in part {i+1}")
-                return False
-                
-            # Check gender
-            if gender not in ['male', 'female']:
-                print(f"Error: Invalid gender in part {i+1}: {gender}")
-                return False
-                
-            # Check text contains Arabic characters
-            if not any('\u0600' <= c <= '\u06FF' for c in text):
-                print(f"Error: Text does not contain Arabic characters in part {i+1}")
-                return False
-        
         return True
 
     def parse_conversation(self, question: Dict) -> List[Tuple[str, str, str]]:
         """
         Convert question into a format for audio generation.
         Returns a list of (speaker, text, gender) tuples.
+        Speaker-labelled conversations are split locally; the LLM is only asked
+        when the local parse does not pass validate_conversation_parts.
         """
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Ask Nova to parse the conversation and assign speakers and genders
-                prompt = f"""
-                You are an Arabic language test audio script generator. Format the following question for audio generation.
+        with self.metrics.timer("parse_local") as fields:
+            parts = parse_question_locally(question)
+            valid = parts is not None and self.validate_conversation_parts(parts)
+            fields["status"] = "ok" if valid else "fallback"
+        if valid:
+            with self._parse_lock:
+                self.parse_stats['local'] += 1
+            return parts
+        
+        with self._parse_lock:
+            self.parse_stats['llm'] += 1
+        print("Local conversation parse failed, falling back to the LLM")
+        return self.parse_conversation_with_llm(question)
 
-                Rules:
-                1. Introduction and Question parts:
-                   - Must start with 'Speaker: Announcer (Gender: male)'
-                   - Keep as separate parts
+    def get_parse_stats(self) -> Dict:
+        """Return how many conversations were parsed locally or by the LLM, and the fallback rate"""
+        with self._parse_lock:
+            local, llm = self.parse_stats['local'], self.parse_stats['llm']
+        total = local + llm
+        return {
+            'local': local,
+            'llm': llm,
+            'fallback_rate': llm / total if total else 0.0
+        }
 
-                2. Conversation parts:
-                   - Name speakers based on their role (Student, Teacher, etc.)
-                   - Must specify gender EXACTLY as either 'Gender: male' or 'Gender: female'
-                   - Use consistent names for the same speaker
-                   - Split long speeches at natural pauses
+    def parse_conversation_with_llm(self, question: Dict) -> List[Tuple[str, str, str]]:
+        """
+        Ask the LLM to split the question into speaker parts.
+        Returns a list of (speaker, text, gender) tuples.
+        Every attempt is timed as parse_llm_attempt, with status invalid or error when it fails.
+        Only invalid output is asked for again; Bedrock errors have already been retried by botocore.
+        """
+        max_attempts = 3
+        for attempt in range(max_attempts):
+            with self.metrics.timer("parse_llm_attempt", attempt=attempt + 1) as fields:
+                parts = self._request_conversation_parts(question)
+                valid = self.validate_conversation_parts(parts)
+                fields["status"] = "ok" if valid else "invalid"
+            if valid:
+                return parts
+                
+            print(f"Attempt {attempt + 1}: Invalid conversation format, retrying...")
+        
+        raise Exception("Failed to generate valid conversation format")
 
-                Format each part EXACTLY like this, with no variations:
-                Speaker: [name] (Gender: male)
-                Text: [Arabic text]
-                ---
+    def _request_conversation_parts(self, question: Dict) -> List[Tuple[str, str, str]]:
+        """Run one LLM parse and return the parts it produced, which may still be invalid"""
+        # Ask Nova to parse the conversation and assign speakers and genders
+        prompt = f"""
+        You are an Arabic language test audio script generator. Format the following question for audio generation.
 
-                Example format:
-                Speaker: Announcer (Gender: male)
-                Text: استمع إلى المحادثة التالية وأجب عن السؤال
-                ---
-                Speaker: Student (Gender: female)
-                Text: عفواً، هل تتوقف هذه الحافلة عند المحطة التالية؟
-                ---
+        Rules:
+        1. Introduction and Question parts:
+           - Must start with 'Speaker: Announcer (Gender: male)'
+           - Keep as separate parts
 
-                Question to format:
-                {json.dumps(question, ensure_ascii=False, indent=2)}
+        2. Conversation parts:
+           - Name speakers based on their role (Student, Teacher, etc.)
+           - Must specify gender EXACTLY as either 'Gender: male' or 'Gender: female'
+           - Use consistent names for the same speaker
+           - Split long speeches at natural pauses
 
-                Output ONLY the formatted parts in order: introduction, conversation, question.
-                Make sure to specify gender EXACTLY as shown in the example.
-                """
-                
-                response = self._invoke_bedrock(prompt)
-                
-                # Parse the response into speaker parts
-                parts = []
-                current_speaker = None
-                current_gender = None
-                current_text = None
-                
-                # Track speakers to maintain consistent gender
-                speaker_genders = {}
-                
-                for line in response.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    if line.startswith('Speaker:'):
-                        # Save previous speaker's part if exists
-                        if current_speaker and current_text:
-                            parts.append((current_speaker, current_text, current_gender))
-                        
-                        # Parse new speaker and gender
-                        try:
-                            speaker_part = line.split('Speaker:')[1].strip()
-                            current_speaker = speaker_part.split('(')[0].strip()
-                            gender_part = speaker_part.split('Gender:')[1].split(')')[0].strip().lower()
-                            
-                            # Normalize gender
-                            if gender_part in ['male', 'ذكر']:
-                                current_gender = 'male'
-                            elif gender_part in ['female', 'أنثى']:
-                                current_gender = 'female'
-                            else:
-                                raise ValueError(f"Invalid gender format: {gender_part}")
-                            
-                            # Check for gender consistency
-                            if current_speaker in speaker_genders:
-                                if current_gender != speaker_genders[current_speaker]:
-                                    print(f"Warning: Gender mismatch for {current_speaker}. Using previously assigned gender {speaker_genders[current_speaker]}")
-                                current_gender = speaker_genders[current_speaker]
-                            else:
-                                speaker_genders[current_speaker] = current_gender
-                        except Exception as e:
-                            print(f"Error parsing speaker/gender: {line}")
-                            raise e
-                            
-                    elif line.startswith('Text:'):
-                        current_text = line.split('Text:')[1].strip()
-                        
-                    elif line == '---' and current_speaker and current_text:
-                        parts.append((current_speaker, current_text, current_gender))
-                        current_speaker = None
-                        current_gender = None
-                        current_text = None
+        Format each part EXACTLY like this, with no variations:
+        Speaker: [name] (Gender: male)
+        Text: [Arabic text]
+        ---
+
+        Example format:
+        Speaker: Announcer (Gender: male)
+        Text: استمع إلى المحادثة التالية وأجب عن السؤال
+        ---
+        Speaker: Student (Gender: female)
+        Text: عفواً، هل تتوقف هذه الحافلة عند المحطة التالية؟
+        ---
+
+        Question to format:
+        {json.dumps(without_answer_key(question), ensure_ascii=False, indent=2)}
+
+        Output ONLY the formatted parts in order: introduction, conversation, question.
+        Make sure to specify gender EXACTLY as shown in the example.
+        """
+        
+        response = self._invoke_bedrock(prompt)
+        
+        # Parse the response into speaker parts
+        parts = []
+        current_speaker = None
+        current_gender = None
+        current_text = None
+        
+        # Track speakers to maintain consistent gender
+        speaker_genders = {}
+        
+        for line in response.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
                 
-                # Add final part if exists
+            if line.startswith('Speaker:'):
+                # Save previous speaker's part if exists
                 if current_speaker and current_text:
                     parts.append((current_speaker, current_text, current_gender))
                 
-                # Validate the parsed parts
-                if self.validate_conversation_parts(parts):
-                    return parts
+                # Parse new speaker and gender
+                try:
+                    speaker_part = line.split('Speaker:')[1].strip()
+                    current_speaker = speaker_part.split('(')[0].strip()
+                    gender_part = speaker_part.split('Gender:')[1].split(')')[0].strip().lower()
+                    
+                    # Normalize gender
+                    if gender_part in ['male', 'ذكر']:
+                        current_gender = 'male'
+                    elif gender_part in ['female', 'أنثى']:
+                        current_gender = 'female'
+                    else:
+                        raise ValueError(f"Invalid gender format: {gender_part}")
+                    
+                    # Check for gender consistency
+                    if current_speaker in speaker_genders:
+                        if current_gender != speaker_genders[current_speaker]:
+                            print(f"Warning: Gender mismatch for {current_speaker}. Using previously assigned gender {speaker_genders[current_speaker]}")
+                        current_gender = speaker_genders[current_speaker]
+                    else:
+                        speaker_genders[current_speaker] = current_gender
+                except Exception as e:
+                    print(f"Error parsing speaker/gender: {line}")
+                    raise e
                     
-                print(f"Attempt {attempt + 1}: Invalid conversation format, retrying...")
+            elif line.startswith('Text:'):
+                current_text = line.split('Text:')[1].strip()
                 
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt == max_retries - 1:
-                    raise Exception("Failed to parse conversation after multiple attempts")
+            elif line == '---' and current_speaker and current_text:
+                parts.append((current_speaker, current_text, current_gender))
+                current_speaker = None
+                current_gender = None
+                current_text = None
         
-        raise Exception("Failed to generate valid conversation format")
+        # Add final part if exists
+        if current_speaker and current_text:
+            parts.append((current_speaker, current_text, current_gender))
+        
+        return parts
 
     def get_voice_for_gender(self, gender: str) -> str:
         """Get an appropriate voice for the given gender"""
@@ -211,115 +257,239 @@ class AudioGenerator:
             return 'Zeina'  # Female voice
 
     def generate_audio_part(self, text: str, voice_name: str) -> str:
-        """Generate audio for a single part using Amazon Polly"""
-        response = self.polly.synthesize_speech(
-            Text=text,
-            OutputFormat='mp3',
-            VoiceId=voice_name,
-            Engine='neural',
-            LanguageCode='arb'  # Arabic language code
-        )
+        """
+        Generate audio for a single part using Amazon Polly.
+        Returns the path of the segment in the segment cache.
+        """
+        cached = self.segment_cache.get(text, voice_name, self.polly_engine, self.output_format)
+        if cached:
+            self.metrics.increment("segment_cache_hits")
+            return cached
+        
+        if self.polly_rate_limiter:
+            self.metrics.observe("polly_rate_limit_wait", self.polly_rate_limiter.acquire())
+        with self.metrics.timer("synthesize_part", voice=voice_name, characters=len(text)) as fields:
+            response = self.polly.synthesize_speech(
+                Text=text,
+                OutputFormat=self.output_format,
+                VoiceId=voice_name,
+                Engine=self.polly_engine,
+                SampleRate=str(self.sample_rate),
+                LanguageCode='arb'  # Arabic language code
+            )
+            data = response['AudioStream'].read()
+            fields["bytes"] = len(data)
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-            temp_file.write(response['AudioStream'].read())
-            return temp_file.name
+        return self.segment_cache.put(
+            text, voice_name, self.polly_engine, self.output_format, data
+        )
 
-    # The rest of the methods remain the same as they handle audio processing
-    # and don't need language-specific changes
-    def combine_audio_files(self, audio_files: List[str], output_file: str):
-        """Combine multiple audio files using ffmpeg"""
-        file_list = None
+    def synthesize_parts(self, parts: List[Tuple[str, str]]) -> List[str]:
+        """
+        Synthesize (text, voice) parts concurrently.
+        Returns the audio files in the same order as the parts.
+        """
+        if len(parts) <= 1 or self.max_workers == 1:
+            return [self.generate_audio_part(text, voice) for text, voice in parts]
+
+        results = []
+        error = None
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(parts))) as executor:
+            futures = [executor.submit(self.generate_audio_part, text, voice) for text, voice in parts]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    error = error or e
+
+        if error:
+            raise Exception(f"Failed to generate audio part: {str(error)}")
+        return results
+
+    def _write_atomic(self, output_file: str, data: bytes):
+        """
+        Write a file in one write to a unique temp file and rename it into place,
+        so concurrent requests for the same question never see or clobber a partial file
+        """
+        fd, temp_file = tempfile.mkstemp(prefix='.question_', suffix='.tmp', dir=os.path.dirname(output_file))
         try:
-            # Create file list for ffmpeg
-            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
-                for audio_file in audio_files:
-                    f.write(f"file '{audio_file}'\n")
-                file_list = f.name
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_file, output_file)
+        except Exception:
+            if os.path.exists(temp_file):
+                os.unlink(temp_file)
+            raise
+
+    def get_question_audio_path(self, question: Dict) -> str:
+        """Return the content-addressed audio file for a question and the current voice config"""
+        payload = json.dumps({
+            "question": question,
+            "voices": self.voices,
+            "engine": self.polly_engine,
+            "format": self.output_format,
+            "layout": AUDIO_LAYOUT_VERSION
+        }, ensure_ascii=False, sort_keys=True)
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.audio_dir, f"question_{digest}.{self.output_format}")
+
+    def _plan_audio(self, parts: List[Tuple[str, str, str]]) -> Tuple[List[Optional[int]], List[Tuple[str, str]]]:
+        """
+        Lay out pauses and spoken parts.
+        Returns the layout, with pause lengths in ms and None as a placeholder for
+        each spoken part, and the (text, voice) pairs to synthesize in order.
+        """
+        audio_parts = []
+        synthesis = []
+        current_section = None
+        
+        long_pause = 2000
+        short_pause = 500
+        
+        for speaker, text, gender in parts:
+            announcer = speaker.lower() == 'announcer'
+            if announcer and 'استمع' in text:  # Arabic intro marker
+                if current_section is not None:
+                    audio_parts.append(long_pause)
+                current_section = 'intro'
+            elif announcer and ('السؤال' in text or 'الخيارات' in text):  # Arabic question/options marker
+                audio_parts.append(long_pause)
+                current_section = 'question'
+            elif current_section == 'intro':
+                # A speaker, or the announcer reading an announcement, starts the listening part
+                audio_parts.append(long_pause)
+                current_section = 'conversation'
             
-            # Combine audio files
-            subprocess.run([
-                'ffmpeg', '-f', 'concat', '-safe', '0',
-                '-i', file_list,
-                '-c', 'copy',
-                output_file
-            ], check=True)
+            voice = self.get_voice_for_gender(gender)
+            print(f"Using voice {voice} for {speaker} ({gender})")
             
-            return True
-        except Exception as e:
-            print(f"Error combining audio files: {str(e)}")
-            if os.path.exists(output_file):
-                os.unlink(output_file)
-            return False
-        finally:
-            # Clean up temporary files
-            if file_list and os.path.exists(file_list):
-                os.unlink(file_list)
-            for audio_file in audio_files:
-                if os.path.exists(audio_file):
-                    try:
-                        os.unlink(audio_file)
-                    except Exception as e:
-                        print(f"Error cleaning up {audio_file}: {str(e)}")
-
-    def generate_silence(self, duration_ms: int) -> str:
-        """Generate a silent audio file of specified duration"""
-        output_file = os.path.join(self.audio_dir, f'silence_{duration_ms}ms.mp3')
-        if not os.path.exists(output_file):
-            subprocess.run([
-                'ffmpeg', '-f', 'lavfi', '-i',
-                f'anullsrc=r=24000:cl=mono:d={duration_ms/1000}',
-                '-c:a', 'libmp3lame', '-b:a', '48k',
-                output_file
-            ])
-        return output_file
+            audio_parts.append(None)
+            synthesis.append((text, voice))
+            
+            if current_section == 'conversation':
+                audio_parts.append(short_pause)
+        
+        return audio_parts, synthesis
 
     def generate_audio(self, question: Dict) -> str:
         """
         Generate audio for the entire question.
         Returns the path to the generated audio file.
+        Identical questions map to the same file, which is returned without any
+        parsing or synthesis if it already exists.
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = os.path.join(self.audio_dir, f"question_{timestamp}.mp3")
+        output_file = self.get_question_audio_path(question)
+        if os.path.exists(output_file):
+            print(f"Reusing existing audio {output_file}")
+            self.metrics.increment("question_audio_reused")
+            return output_file
         
         try:
-            parts = self.parse_conversation(question)
-            audio_parts = []
-            current_section = None
-            
-            long_pause = self.generate_silence(2000)
-            short_pause = self.generate_silence(500)
-            
-            for speaker, text, gender in parts:
-                if speaker.lower() == 'announcer':
-                    if 'استمع' in text:  # Arabic intro marker
-                        if current_section is not None:
-                            audio_parts.append(long_pause)
-                        current_section = 'intro'
-                    elif 'السؤال' in text or 'الخيارات' in text:  # Arabic question/options marker
-                        audio_parts.append(long_pause)
-                        current_section = 'question'
-                elif current_section == 'intro':
-                    audio_parts.append(long_pause)
-                    current_section = 'conversation'
-                
-                voice = self.get_voice_for_gender(gender)
-                print(f"Using voice {voice} for {speaker} ({gender})")
+            with self.metrics.timer("generate_audio"):
+                parts = self.parse_conversation(question)
+                audio_parts, synthesis = self._plan_audio(parts)
                 
-                audio_file = self.generate_audio_part(text, voice)
-                if not audio_file:
-                    raise Exception("Failed to generate audio part")
-                audio_parts.append(audio_file)
-                
-                if current_section == 'conversation':
-                    audio_parts.append(short_pause)
-            
-            if not self.combine_audio_files(audio_parts, output_file):
-                raise Exception("Failed to combine audio files")
+                # Synthesize every part concurrently, then assemble frames and silence in memory
+                with self.metrics.timer("synthesize_all", parts=len(synthesis)):
+                    audio_files = self.synthesize_parts(synthesis)
+                self._assemble_and_write(output_file, audio_parts, audio_files)
+            return output_file
             
+        except Exception as e:
+            raise Exception(f"Audio generation failed: {str(e)}")
+
+    def _assemble_and_write(self, output_file: str, audio_parts: List[Optional[int]], audio_files: List[str]):
+        """Fill the layout's spoken parts with the synthesized files, in order, and save the result"""
+        audio_files = iter(audio_files)
+        with self.metrics.timer("assemble", parts=len(audio_parts)):
+            assembler = Mp3Assembler(self.sample_rate)
+            for part in audio_parts:
+                if part is None:
+                    assembler.append_file(next(audio_files))
+                else:
+                    assembler.append_silence(part)
+            data = assembler.to_bytes()
+        
+        with self.metrics.timer("write", bytes=len(data)):
+            self._write_atomic(output_file, data)
+        self.metrics.increment("bytes_written", len(data))
+
+    async def agenerate_audio(self, question: Dict) -> str:
+        """
+        generate_audio without blocking the event loop.
+        Every part is synthesized on the shared IO executor rather than a pool per
+        question, so many questions can render concurrently from one event loop.
+        """
+        output_file = self.get_question_audio_path(question)
+        if os.path.exists(output_file):
+            self.metrics.increment("question_audio_reused")
+            return output_file
+        
+        try:
+            with self.metrics.timer("generate_audio"):
+                parts = await run_blocking(self.parse_conversation, question)
+                audio_parts, synthesis = self._plan_audio(parts)
+                
+                with self.metrics.timer("synthesize_all", parts=len(synthesis)):
+                    audio_files = await asyncio.gather(*(
+                        run_blocking(self.generate_audio_part, text, voice)
+                        for text, voice in synthesis
+                    ))
+                await run_blocking(self._assemble_and_write, output_file, audio_parts, audio_files)
             return output_file
             
         except Exception as e:
-            if os.path.exists(output_file):
-                os.unlink(output_file)
             raise Exception(f"Audio generation failed: {str(e)}")
+
+    def generate_audio_stream(self, question: Dict, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Generate audio for the entire question as a stream of MP3 chunks, in order.
+        Every part is submitted to the synthesis pool up front and yielded as soon as
+        it and all parts before it are ready, so playback can start after the first
+        part. The complete file is saved at get_question_audio_path afterwards, and
+        later requests for the same question stream that file directly.
+        """
+        start = time.perf_counter()
+        output_file = self.get_question_audio_path(question)
+        if os.path.exists(output_file):
+            with open(output_file, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+        
+        parts = self.parse_conversation(question)
+        audio_parts, synthesis = self._plan_audio(parts)
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(synthesis))))
+        try:
+            futures = iter([
+                executor.submit(self.generate_audio_part, text, voice)
+                for text, voice in synthesis
+            ])
+            assembler = Mp3Assembler(self.sample_rate)
+            for part in audio_parts:
+                piece = Mp3Assembler(assembler.sample_rate, assembler.channels)
+                if part is None:
+                    try:
+                        piece.append_file(next(futures).result())
+                    except Exception as e:
+                        raise Exception(f"Audio generation failed: {str(e)}")
+                else:
+                    piece.append_silence(part)
+                data = piece.to_bytes()
+                assembler.append_bytes(data)
+                if part is None and start is not None:
+                    # Time to first audio: the parse plus one synthesized part
+                    self.metrics.observe("stream_first_audio", time.perf_counter() - start)
+                    start = None
+                yield data
+            
+            data = assembler.to_bytes()
+            with self.metrics.timer("write", bytes=len(data)):
+                self._write_atomic(output_file, data)
+            self.metrics.increment("bytes_written", len(data))
+        finally:
+            # Stop pending synthesis if the consumer goes away early
+            executor.shutdown(wait=False, cancel_futures=True)
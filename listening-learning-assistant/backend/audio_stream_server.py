@@ -0,0 +1,257 @@
+import os
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+from backend.audio_generator import AudioGenerator
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+class _Render:
+    def __init__(self):
+        """One synthesis of a question's audio, tailed by every request for its token"""
+        self.buffer = bytearray()
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.readers = 0
+        self.cond = threading.Condition()
+
+class _Stream:
+    def __init__(self, audio_generator: AudioGenerator, question: Dict, on_complete: Optional[Callable[[str], None]]):
+        self.audio_generator = audio_generator
+        self.question = question
+        self.on_complete = on_complete
+        self.audio_file: Optional[str] = None
+        self.render: Optional[_Render] = None
+        self.last_access = time.monotonic()
+
+class AudioStreamServer:
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        public_host: Optional[str] = None,
+        ttl_seconds: float = 3600.0
+    ):
+        """
+        Serve question audio over HTTP while it is being synthesized, so a browser
+        <audio> element starts playing after the first part instead of the whole file
+
+        Args:
+            host (str): Interface to bind, AUDIO_STREAM_HOST or 127.0.0.1 by default
+            port (int): Port to bind, AUDIO_STREAM_PORT or 8502 by default; 0 picks a free port
+            public_host (str): Host name used in URLs handed to the browser
+            ttl_seconds (float): Streams not requested for this long are forgotten
+        """
+        host = host or os.environ.get("AUDIO_STREAM_HOST", "127.0.0.1")
+        port = int(os.environ.get("AUDIO_STREAM_PORT", 8502)) if port is None else port
+        self.public_host = public_host or os.environ.get("AUDIO_STREAM_PUBLIC_HOST", "localhost")
+        self.ttl_seconds = ttl_seconds
+        self._streams: Dict[str, _Stream] = {}
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def register(
+        self,
+        audio_generator: AudioGenerator,
+        question: Dict,
+        on_complete: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Make a question streamable and return the URL to play it from.
+        on_complete is called with the audio file path once the full file has been written.
+        """
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._streams[token] = _Stream(audio_generator, question, on_complete)
+        return f"http://{self.public_host}:{self.port}/audio/{token}.mp3"
+
+    def lookup(self, token: str) -> Optional[_Stream]:
+        with self._lock:
+            self._expire()
+            stream = self._streams.get(token)
+            if stream is not None:
+                stream.last_access = time.monotonic()
+            return stream
+
+    def _expire(self):
+        """Forget idle streams; callers hold the lock"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        for token, stream in list(self._streams.items()):
+            rendering = stream.render is not None and not stream.render.done and stream.render.error is None
+            if stream.last_access < cutoff and not rendering:
+                del self._streams[token]
+
+    def _attach(self, stream: _Stream) -> Optional[_Render]:
+        """
+        Join the render of a stream, starting it if none is running.
+        Returns None once the full file exists, which is then served directly.
+        """
+        with self._lock:
+            if stream.audio_file and os.path.exists(stream.audio_file):
+                return None
+            render = stream.render
+            if render is not None:
+                with render.cond:
+                    # Replays and parallel requests share a render while it still has its bytes
+                    if render.error is None and render.buffer is not None:
+                        render.readers += 1
+                        return render
+            # No render yet, the last one failed, or it finished and its saved file is gone
+            render = stream.render = _Render()
+            render.readers = 1
+            threading.Thread(target=self._render, args=(stream, render), daemon=True).start()
+            return render
+
+    def _detach(self, render: _Render):
+        with render.cond:
+            render.readers -= 1
+            if render.done and not render.readers:
+                # Later requests read the saved file
+                render.buffer = None
+
+    def _render(self, stream: _Stream, render: _Render):
+        try:
+            for chunk in stream.audio_generator.generate_audio_stream(stream.question):
+                with render.cond:
+                    render.buffer.extend(chunk)
+                    render.cond.notify_all()
+        except Exception as e:
+            print(f"Error streaming audio: {str(e)}")
+            with render.cond:
+                render.error = e
+                render.cond.notify_all()
+            return
+
+        audio_file = stream.audio_generator.get_question_audio_path(stream.question)
+        with self._lock:
+            stream.audio_file = audio_file
+        with render.cond:
+            render.done = True
+            if not render.readers:
+                render.buffer = None
+            render.cond.notify_all()
+        if stream.on_complete:
+            try:
+                stream.on_complete(audio_file)
+            except Exception as e:
+                print(f"Error recording audio file: {str(e)}")
+
+    def shutdown(self):
+        """Stop serving and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+                stream = server.lookup(name[:-len(".mp3")]) if name.endswith(".mp3") else None
+                if stream is None:
+                    self.send_error(404, "Unknown audio stream")
+                    return
+
+                render = server._attach(stream)
+                if render is None:
+                    self._send_file(stream.audio_file)
+                    return
+                try:
+                    self._send_render(render)
+                finally:
+                    server._detach(render)
+
+            def _send_file(self, path: str):
+                """Serve a finished file, honouring a single byte range so players can seek"""
+                size = os.path.getsize(path)
+                start, end = 0, size - 1
+                status = 200
+                match = RANGE_PATTERN.match(self.headers.get("Range", "").strip())
+                if match and (match.group(1) or match.group(2)):
+                    if match.group(1):
+                        start = int(match.group(1))
+                        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                    else:
+                        # Suffix range: the last N bytes
+                        start = max(0, size - int(match.group(2)))
+                    if start >= size or start > end:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status = 206
+
+                self.send_response(status)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(end - start + 1))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                self.end_headers()
+                try:
+                    with open(path, 'rb') as f:
+                        f.seek(start)
+                        remaining = end - start + 1
+                        while remaining > 0:
+                            chunk = f.read(min(64 * 1024, remaining))
+                            if not chunk:
+                                break
+                            self.wfile.write(chunk)
+                            remaining -= len(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _next_chunk(self, render: _Render, offset: int) -> Tuple[bytes, bool]:
+                """Wait for bytes past offset; returns them and whether the render has ended"""
+                with render.cond:
+                    while len(render.buffer) == offset and not render.done and render.error is None:
+                        render.cond.wait()
+                    return bytes(render.buffer[offset:]), render.done or render.error is not None
+
+            def _send_render(self, render: _Render):
+                """Tail an in-progress render from its first byte; ranges cannot be served until it ends"""
+                # Wait for the first part before committing to a 200, so failures still get an error status
+                first, ended = self._next_chunk(render, 0)
+                if not first:
+                    self.send_error(502, "Audio generation failed")
+                    return
+
+                # No Content-Length: the total size is unknown until the last part is synthesized
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                offset = 0
+                chunk = first
+                try:
+                    while chunk:
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+                        offset += len(chunk)
+                        if ended:
+                            break
+                        chunk, ended = self._next_chunk(render, offset)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The player went away; the render carries on so a replay finds the saved file
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,194 @@
+import asyncio
+import functools
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import boto3
+from botocore.config import Config
+
+from backend.metrics import StageMetrics
+from backend.rate_limit import TokenBucket
+
+DEFAULT_REGION = os.environ.get("BEDROCK_REGION", "us-east-1")
+
+# Threads that run blocking AWS calls for async callers; each holds one request in flight
+IO_WORKERS = int(os.environ.get("AWS_IO_WORKERS", 256))
+
+# Shared by every thread in the process, so leave a connection for every IO worker
+MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", IO_WORKERS))
+
+# Adaptive mode backs off on throttling errors and slows the client down instead of retrying in lockstep.
+# This is the only retry layer for AWS errors; callers do not loop around their calls.
+RETRY_CONFIG = {
+    "total_max_attempts": int(os.environ.get("AWS_MAX_ATTEMPTS", 5)),
+    "mode": "adaptive"
+}
+
+# Mark static system prompts as a cache point so Bedrock reuses their processing across requests.
+# Off by default: only some models support prompt caching, and the others reject the request.
+PROMPT_CACHE = os.environ.get("BEDROCK_PROMPT_CACHE", "").lower() in ("1", "true", "yes")
+
+# Requests per second allowed per service operation across the process; set to 0 to disable a limiter.
+# Chat models and Titan embeddings have separate account quotas, so ingestion
+# embedding in parallel does not slow down interactive generation.
+DEFAULT_RATES = {
+    ("bedrock-runtime", "converse"): float(os.environ.get("BEDROCK_REQUESTS_PER_SECOND", 10)),
+    ("bedrock-runtime", "invoke_model"): float(os.environ.get("EMBEDDING_REQUESTS_PER_SECOND", 30)),
+    ("polly", "synthesize_speech"): float(os.environ.get("POLLY_REQUESTS_PER_SECOND", 8)),
+}
+
+# Counter names for the token counts converse reports in its usage field
+TOKEN_COUNTERS = {
+    "input_tokens": "inputTokens",
+    "output_tokens": "outputTokens",
+    "cache_read_input_tokens": "cacheReadInputTokens",
+    "cache_write_input_tokens": "cacheWriteInputTokens",
+}
+
+_clients: Dict[tuple, Any] = {}
+_limiters: Dict[tuple, Optional[TokenBucket]] = {}
+_io_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor that async callers offload blocking calls to"""
+    global _io_executor
+    with _lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="aws-io")
+        return _io_executor
+
+async def run_blocking(func: Callable, *args, **kwargs):
+    """
+    Run a blocking function on the IO executor and await its result.
+    boto3 has no asyncio support, so the event loop hands each call to a thread
+    and stays free to keep hundreds of requests in flight.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+def get_client(service: str, region: Optional[str] = None):
+    """
+    Return the process-wide boto3 client for a service.
+    boto3 clients are thread-safe, so one client and its connection pool serve
+    every session and worker thread instead of paying a TLS handshake per client.
+    Set FAKE_AWS_URL to send every call to a local stand-in such as backend.fake_aws.
+    """
+    endpoint_url = os.environ.get("FAKE_AWS_URL") or None
+    key = (service, region or DEFAULT_REGION, endpoint_url)
+    with _lock:
+        if key not in _clients:
+            kwargs = {}
+            if endpoint_url:
+                # The stand-in ignores signatures, but botocore still needs credentials to sign with
+                kwargs = {"endpoint_url": endpoint_url, "aws_access_key_id": "fake", "aws_secret_access_key": "fake"}
+            _clients[key] = boto3.client(
+                service,
+                region_name=key[1],
+                config=Config(
+                    max_pool_connections=MAX_POOL_CONNECTIONS,
+                    retries=RETRY_CONFIG,
+                    connect_timeout=10,
+                    read_timeout=120
+                ),
+                **kwargs
+            )
+        return _clients[key]
+
+def system_blocks(text: str, cache: Optional[bool] = None) -> List[Dict]:
+    """Build converse system content, followed by a cache point when prompt caching is on"""
+    blocks = [{"text": text}]
+    if PROMPT_CACHE if cache is None else cache:
+        blocks.append({"cachePoint": {"type": "default"}})
+    return blocks
+
+def get_rate_limiter(service: str, operation: str) -> Optional[TokenBucket]:
+    """Return the process-wide token bucket for an operation's account quota, or None if disabled"""
+    key = (service, operation)
+    with _lock:
+        if key not in _limiters:
+            rate = DEFAULT_RATES.get(key, 0)
+            _limiters[key] = TokenBucket(rate) if rate > 0 else None
+        return _limiters[key]
+
+class BedrockClient:
+    def __init__(self, region: Optional[str] = None):
+        """
+        Bedrock runtime calls through the shared client, paced by the shared limiter
+        for each operation and timed. converse and invoke_model take the same
+        arguments as the boto3 methods.
+        """
+        self.client = get_client('bedrock-runtime', region)
+        self.rate_limiters = {
+            operation: get_rate_limiter('bedrock-runtime', operation)
+            for operation in ("converse", "invoke_model")
+        }
+        self.metrics = StageMetrics("bedrock")
+
+    def _call(self, operation: str, model_id: str, **kwargs) -> Dict:
+        rate_limiter = self.rate_limiters[operation]
+        if rate_limiter:
+            self.metrics.observe(f"{operation}_rate_limit_wait", rate_limiter.acquire())
+        with self.metrics.timer(operation, model_id=model_id):
+            response = getattr(self.client, operation)(modelId=model_id, **kwargs)
+        usage = response.get('usage') if operation == "converse" else None
+        if usage:
+            self.metrics.increment("converse_responses", model_id=model_id)
+            for name, key in TOKEN_COUNTERS.items():
+                if usage.get(key):
+                    self.metrics.increment(name, usage[key], model_id=model_id)
+        return response
+
+    def converse(self, modelId: str, messages: List[Dict], **kwargs) -> Dict:
+        """Call the converse API"""
+        return self._call("converse", modelId, messages=messages, **kwargs)
+
+    def converse_text(
+        self,
+        model_id: str,
+        prompt: str,
+        inference_config: Optional[Dict] = None,
+        system: Optional[str] = None
+    ) -> str:
+        """Send a single user message and return the text of the reply"""
+        kwargs = {}
+        if inference_config:
+            kwargs["inferenceConfig"] = inference_config
+        if system:
+            kwargs["system"] = system_blocks(system)
+        response = self.converse(
+            modelId=model_id,
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            **kwargs
+        )
+        return response['output']['message']['content'][0]['text']
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict:
+        """Call the invoke_model API"""
+        return self._call("invoke_model", modelId, body=body, **kwargs)
+
+    def invoke_model_json(self, model_id: str, payload: Dict) -> Dict:
+        """Invoke a model with a JSON request body and return the parsed JSON response"""
+        response = self.invoke_model(modelId=model_id, body=json.dumps(payload))
+        return json.loads(response['body'].read())
+
+_bedrock_client: Optional[BedrockClient] = None
+
+def get_bedrock_client() -> BedrockClient:
+    """Return the process-wide Bedrock runtime wrapper"""
+    global _bedrock_client
+    with _lock:
+        if _bedrock_client is not None:
+            return _bedrock_client
+    client = BedrockClient()
+    with _lock:
+        if _bedrock_client is None:
+            _bedrock_client = client
+        return _bedrock_client
+
+def get_polly_client():
+    """Return the process-wide Polly client"""
+    return get_client('polly')
@@ -0,0 +1,224 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend.metrics import percentiles
+from backend.synthetic_data import ITEMS, PLACES, TOPICS, synthetic_question
+from backend.vector_store import EMBEDDING_BACKENDS, QuestionVectorStore
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples in seconds as a count, mean and percentiles in milliseconds"""
+    return {"count": len(samples), "mean_ms": statistics.fmean(samples) * 1000, **percentiles(samples)}
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of every file below a directory"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, where the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if platform.system() == "Darwin" else peak * 1024
+
+def run_size(
+    size: int,
+    backend: str,
+    queries: int,
+    questions_per_video: int,
+    chunk_size: int,
+    memory_index: bool,
+    seed: int,
+    work_dir: str
+) -> Dict:
+    """Ingest a synthetic corpus of the given size and measure reads against it"""
+    rng = random.Random(seed)
+    persist_directory = os.path.join(work_dir, f"store_{size}")
+    store = QuestionVectorStore(persist_directory, embedding_backend=backend)
+
+    # Split the corpus between sections 2 and 3, grouped into synthetic videos
+    ingest_seconds = 0.0
+    question_ids = {2: [], 3: []}
+    for section_num, section_size in ((2, size - size // 2), (3, size // 2)):
+        batches = []
+        for video_idx in range(0, section_size, questions_per_video):
+            video_id = f"bench{section_num}v{video_idx // questions_per_video:07d}"
+            count = min(questions_per_video, section_size - video_idx)
+            batches.append((video_id, [synthetic_question(rng, section_num) for _ in range(count)]))
+            question_ids[section_num].extend(
+                store.make_question_id(video_id, section_num, idx) for idx in range(count)
+            )
+        start = time.perf_counter()
+        store.add_question_batches(section_num, batches, chunk_size=chunk_size)
+        ingest_seconds += time.perf_counter() - start
+
+    if memory_index:
+        start = time.perf_counter()
+        store.rebuild_memory_index()
+        index_build_seconds = time.perf_counter() - start
+    else:
+        index_build_seconds = None
+
+    query_texts = [f"{rng.choice(ITEMS)} في {rng.choice(PLACES)}" for _ in range(queries)]
+
+    search_samples, filtered_samples, get_samples = [], [], []
+    for text in query_texts:
+        section_num = rng.choice([2, 3])
+        start = time.perf_counter()
+        store.search_similar_questions(section_num, text, n_results=3)
+        search_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        store.search_similar_questions(section_num, text, n_results=3, where={"topic": rng.choice(TOPICS)})
+        filtered_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        store.get_question_by_id(section_num, rng.choice(question_ids[section_num]))
+        get_samples.append(time.perf_counter() - start)
+
+    batch_start = time.perf_counter()
+    store.search_similar_questions_batch(2, TOPICS, n_results=3, dedupe=True)
+    batch_ms = (time.perf_counter() - batch_start) * 1000
+
+    return {
+        "size": size,
+        "ingest_seconds": ingest_seconds,
+        "ingest_questions_per_second": size / ingest_seconds if ingest_seconds > 0 else None,
+        "memory_index_build_seconds": index_build_seconds,
+        "search_similar_questions": summarize(search_samples),
+        "search_similar_questions_filtered": summarize(filtered_samples),
+        "get_question_by_id": summarize(get_samples),
+        "search_batch_all_topics_ms": batch_ms,
+        "disk_bytes": directory_size(persist_directory),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+def run_size_isolated(*args) -> Dict:
+    """
+    Run one size in a fresh process.
+    ru_maxrss is the peak of the whole process, so sizes sharing one process would
+    each report the running maximum instead of their own footprint.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_size, *args).result()
+
+def compare(current: Dict, baseline: Dict):
+    """Print per-size changes of the headline numbers against an earlier run"""
+    previous = {run["size"]: run for run in baseline.get("runs", [])}
+    print("\nComparison with baseline")
+    for run in current["runs"]:
+        before = previous.get(run["size"])
+        if not before:
+            print(f"  size {run['size']}: no baseline")
+            continue
+        rows = [
+            ("ingest q/s", run["ingest_questions_per_second"], before["ingest_questions_per_second"]),
+            ("search p50 ms", run["search_similar_questions"]["p50_ms"], before["search_similar_questions"]["p50_ms"]),
+            ("search p99 ms", run["search_similar_questions"]["p99_ms"], before["search_similar_questions"]["p99_ms"]),
+            ("get p50 ms", run["get_question_by_id"]["p50_ms"], before["get_question_by_id"]["p50_ms"]),
+            ("disk MB", run["disk_bytes"] / 1e6, before["disk_bytes"] / 1e6),
+        ]
+        print(f"  size {run['size']}:")
+        for label, now, then in rows:
+            if now is None or not then:
+                continue
+            print(f"    {label:<14} {then:>12.3f} -> {now:>12.3f} ({(now - then) / then * 100:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark QuestionVectorStore on synthetic Arabic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000],
+                        help="corpus sizes to benchmark, e.g. 10000 100000 1000000")
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS, default="hashing",
+                        help="embedding backend (default: the deterministic local hashing backend)")
+    parser.add_argument("--queries", type=int, default=500, help="timed queries per size")
+    parser.add_argument("--questions-per-video", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=1024, help="questions per embedding batch and write")
+    parser.add_argument("--memory-index", action="store_true", help="serve reads from the in-memory index")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--work-dir", default=None, help="where stores are built (default: a temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated stores")
+    parser.add_argument("--output", default=None,
+                        help="results file (default: backend/data/benchmarks/vector_store_<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="vector_store_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    try:
+        import chromadb
+        chromadb_version = chromadb.__version__
+    except Exception:
+        chromadb_version = None
+
+    results = {
+        "benchmark": "vector_store",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {
+            "backend": args.backend,
+            "queries": args.queries,
+            "questions_per_video": args.questions_per_video,
+            "chunk_size": args.chunk_size,
+            "memory_index": args.memory_index,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "chromadb": chromadb_version,
+        },
+        "runs": [],
+    }
+
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} questions...")
+            run = run_size_isolated(size, args.backend, args.queries, args.questions_per_video,
+                           args.chunk_size, args.memory_index, args.seed, work_dir)
+            results["runs"].append(run)
+            print(f"  ingest: {run['ingest_questions_per_second']:.1f} q/s, "
+                  f"search p50/p95/p99: {run['search_similar_questions']['p50_ms']:.2f}/"
+                  f"{run['search_similar_questions']['p95_ms']:.2f}/"
+                  f"{run['search_similar_questions']['p99_ms']:.2f} ms, "
+                  f"disk: {run['disk_bytes'] / 1e6:.1f} MB")
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        "backend", "data", "benchmarks", f"vector_store_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
-import boto3
 import streamlit as st
 from typing import Optional, Dict, Any
+from backend.bedrock_client import get_bedrock_client
 
 # Model ID - Using a model that handles Arabic well
 MODEL_ID = "amazon.nova-micro-v1:0"
@@ -8,7 +8,7 @@ MODEL_ID = "amazon.nova-micro-v1:0"
 class BedrockChat:
     def __init__(self, model_id: str = MODEL_ID):
         """Initialize Bedrock chat client"""
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
+        self.bedrock_client = get_bedrock_client()
         self.model_id = model_id
         
     def generate_response(self, message: str, inference_config: Optional[Dict[str, Any]] = None) -> Optional[str]:
@@ -24,25 +24,11 @@ class BedrockChat:
 
         # Prepare the conversation context
         system_context = "You are a friendly assistant helping with Arabic language learning."
-        
-        messages = [
-            {
-                "role": "system",
-                "content": [{"text": system_context}]
-            },
-            {
-                "role": "user",
-                "content": [{"text": message}]
-            }
-        ]
 
         try:
-            response = self.bedrock_client.converse(
-                modelId=self.model_id,
-                messages=messages,
-                inferenceConfig=inference_config
+            return self.bedrock_client.converse_text(
+                self.model_id, message, inference_config, system=system_context
             )
-            return response['output']['message']['content'][0]['text']
             
         except Exception as e:
             st.error(f"Error generating response: {str(e)}")
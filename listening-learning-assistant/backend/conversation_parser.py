@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Harakat and tatweel never change who is speaking
+DIACRITICS = re.compile(r'[\u064B-\u0652\u0670\u0640]')
+
+# A speaker label candidate is a single word followed by a colon, at the start of the text or after a pause
+LABEL_PATTERN = re.compile(r'(?:^|(?<=[\s.!?؟،؛]))([^\s:.!?؟،؛]+)\s*:')
+
+# Roles and names that show up as speaker labels in generated conversations
+GENDER_LEXICON = {
+    'male': [
+        'رجل', 'الرجل', 'طالب', 'الطالب', 'معلم', 'المعلم', 'مدرس', 'المدرس', 'استاذ', 'الاستاذ',
+        'موظف', 'الموظف', 'زبون', 'الزبون', 'عميل', 'العميل', 'بائع', 'البائع', 'طبيب', 'الطبيب',
+        'ممرض', 'الممرض', 'صيدلي', 'الصيدلي', 'سائق', 'السائق', 'مدير', 'المدير', 'نادل', 'النادل',
+        'اب', 'الاب', 'ابي', 'ابن', 'الابن', 'اخ', 'الاخ', 'ولد', 'الولد', 'شاب', 'الشاب',
+        'صديق', 'الصديق', 'جار', 'الجار', 'زوج', 'الزوج', 'جد', 'الجد', 'مسافر', 'المسافر',
+        'مذيع', 'المذيع', 'متحدث', 'المتحدث',
+        'محمد', 'احمد', 'علي', 'عمر', 'خالد', 'يوسف', 'ابراهيم', 'حسن', 'كريم', 'سامي', 'طارق',
+        'man', 'male', 'boy',
+    ],
+    'female': [
+        'امراة', 'المراة', 'سيدة', 'السيدة', 'فتاة', 'الفتاة', 'بنت', 'البنت', 'ام', 'الام', 'امي',
+        'اخت', 'الاخت', 'زوجة', 'الزوجة', 'جدة', 'الجدة',
+        'طالبة', 'الطالبة', 'معلمة', 'المعلمة', 'مدرسة', 'المدرسة', 'استاذة', 'الاستاذة',
+        'موظفة', 'الموظفة', 'زبونة', 'الزبونة', 'عميلة', 'العميلة', 'بائعة', 'البائعة',
+        'طبيبة', 'الطبيبة', 'ممرضة', 'الممرضة', 'صيدلية', 'الصيدلية', 'مديرة', 'المديرة',
+        'صديقة', 'الصديقة', 'جارة', 'الجارة', 'مسافرة', 'المسافرة', 'مذيعة', 'المذيعة',
+        'فاطمة', 'مريم', 'سارة', 'ليلى', 'هند', 'عائشة', 'زينب', 'نادية', 'سلمى', 'امل', 'رنا',
+        'woman', 'female', 'girl',
+    ],
+}
+
+def normalize_label(label: str) -> str:
+    """Fold diacritics, hamza forms and case so label spellings compare equal"""
+    label = DIACRITICS.sub('', label.strip())
+    label = re.sub('[أإآ]', 'ا', label)
+    return label.replace('ى', 'ي').lower()
+
+SPEAKER_GENDERS = {
+    normalize_label(word): gender
+    for gender, words in GENDER_LEXICON.items()
+    for word in words
+}
+
+def speaker_gender(label: str, guess: bool = True) -> Optional[str]:
+    """
+    Guess the gender of a speaker label.
+    Known roles and names come from the lexicon; otherwise, with guess, a definite role is
+    feminine when it ends in taa marbuta (e.g. المهندسة) and masculine when it does not.
+    Returns None when the label is not recognized.
+    """
+    normalized = normalize_label(label)
+    if normalized in SPEAKER_GENDERS:
+        return SPEAKER_GENDERS[normalized]
+    if guess and normalized.startswith('ال') and len(normalized) > 3:
+        return 'female' if normalized.endswith('ة') else 'male'
+    return None
+
+def has_arabic(text: str) -> bool:
+    """Whether text contains any Arabic characters"""
+    return any('\u0600' <= c <= '\u06FF' for c in text)
+
+def starts_turn(text: str, position: int) -> bool:
+    """Whether position is at the start of the text, of a line, or of a sentence"""
+    before = text[:position].rstrip(' \t')
+    return not before or before[-1] in '\n.!?؟'
+
+def split_conversation(text: str) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    Split a conversation on its speaker labels.
+    Labels only count at the start of the text, a line or a sentence.
+    Returns (speaker, text, gender) tuples, or None if any speech cannot be attributed.
+    """
+    labels = []
+    for match in LABEL_PATTERN.finditer(text):
+        if starts_turn(text, match.start()):
+            if speaker_gender(match.group(1)):
+                labels.append(match)
+        elif speaker_gender(match.group(1), guess=False):
+            # A known role mid-sentence is either reported speech ("قال الطبيب: ...")
+            # or a turn missing its punctuation; leave it to the LLM rather than guess
+            return None
+    if not labels:
+        return None
+
+    # Speech before the first label has no speaker
+    if text[:labels[0].start()].strip():
+        return None
+
+    parts = []
+    for i, match in enumerate(labels):
+        end = labels[i + 1].start() if i + 1 < len(labels) else len(text)
+        speech = text[match.end():end].strip()
+        if not speech:
+            return None
+        speaker = match.group(1).strip()
+        parts.append((speaker, speech, speaker_gender(speaker)))
+    return parts
+
+def conversation_parts_error(parts: List[Tuple[str, str, str]]) -> Optional[str]:
+    """
+    Check that conversation parts can be voiced.
+    Returns a description of the first problem found, or None if the parts are valid.
+    """
+    if not parts:
+        return "No conversation parts generated"
+
+    # Check that we have an announcer for intro
+    if not parts[0][0].lower() == 'announcer':
+        return "First speaker must be Announcer"
+
+    # Check that each part has valid content
+    for i, (speaker, text, gender) in enumerate(parts):
+        if not speaker or not isinstance(speaker, str):
+            return f"Invalid speaker in part {i+1}"
+        if not text or not isinstance(text, str):
+            return f"Invalid text in part {i+1}"
+        if gender not in ['male', 'female']:
+            return f"Invalid gender in part {i+1}: {gender}"
+        if not has_arabic(text):
+            return f"Text does not contain Arabic characters in part {i+1}"
+    return None
+
+def with_listening_cue(introduction: str, cue: str) -> str:
+    """The audio layout recognizes the introduction by its listening cue"""
+    return introduction if 'استمع' in introduction else f"{cue} {introduction}"
+
+def parse_question_locally(question: Dict) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    Convert a question into (speaker, text, gender) parts without calling a model.
+    Produces the same layout the LLM is asked for: the announcer's introduction,
+    the conversation split by speaker, then the announcer's question.
+    A situation that follows an introduction is split by speaker when it is a
+    dialogue and read by the announcer when it is an announcement.
+    Returns None if the question does not follow the usual patterns.
+    """
+    introduction = (question.get('Introduction') or '').strip()
+    situation = (question.get('Situation') or '').strip()
+    conversation = (question.get('Conversation') or '').strip()
+    question_text = (question.get('Question') or '').strip()
+    if not question_text:
+        return None
+    # Checked before the Arabic listening cues are added, which would always pass it
+    if not all(has_arabic(text) for text in (introduction, situation, conversation, question_text) if text):
+        return None
+
+    if introduction:
+        cue = "استمع إلى المحادثة التالية." if conversation else "استمع."
+        parts = [('Announcer', with_listening_cue(introduction, cue), 'male')]
+        if situation:
+            parts.extend(split_conversation(situation) or [('Announcer', situation, 'male')])
+        elif not conversation:
+            # Section 2 questions need a conversation
+            return None
+    elif situation:
+        parts = [('Announcer', with_listening_cue(situation, "استمع."), 'male')]
+    else:
+        return None
+
+    if conversation:
+        speeches = split_conversation(conversation)
+        if speeches is None:
+            return None
+        parts.extend(speeches)
+
+    if 'السؤال' not in question_text:
+        question_text = f"السؤال: {question_text}"
+    parts.append(('Announcer', question_text, 'male'))
+    return parts
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report how many stored questions the rule-based conversation parser handles"
+    )
+    parser.add_argument("--questions-file", default=os.path.join("backend", "data", "stored_questions.json"))
+    parser.add_argument("--show-failures", action="store_true", help="print the questions that need the LLM")
+    args = parser.parse_args()
+
+    with open(args.questions_file, 'r', encoding='utf-8') as f:
+        stored = json.load(f)
+
+    # The same check the audio generator applies before it falls back to the LLM
+    failures = []
+    for question_id, entry in stored.items():
+        parts = parse_question_locally(entry['question'])
+        if parts is None or conversation_parts_error(parts) is not None:
+            failures.append(question_id)
+
+    total = len(stored)
+    print(f"Questions: {total}")
+    print(f"Parsed locally: {total - len(failures)}")
+    print(f"Needs LLM fallback: {len(failures)} ({len(failures) / total * 100 if total else 0:.1f}%)")
+    if args.show_failures:
+        for question_id in failures:
+            print(f"  {question_id}: {json.dumps(stored[question_id]['question'], ensure_ascii=False)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+class EmbeddingCache:
+    def __init__(self, path: str, max_entries: int = 100000):
+        """
+        Initialize a persistent, content-addressed embedding cache
+
+        Args:
+            path (str): SQLite file holding the cached vectors
+            max_entries (int): Least recently used entries are evicted above this size
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Embedding batches are served from worker threads, so access is serialized here
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+        )
+        self.conn.commit()
+        self._entries = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        """Build the cache key for a (model_id, text) pair"""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model_id}:{digest}"
+
+    def get_many(self, model_id: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up cached embeddings, returning None for every miss"""
+        keys = [self.make_key(model_id, text) for text in texts]
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array('f', blob).tolist()
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self.conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model_id: str, texts: List[str], embeddings: List[List[float]]):
+        """Store embeddings for the given texts and evict the oldest entries if needed"""
+        if not texts:
+            return
+        now = time.time()
+        rows = [
+            (self.make_key(model_id, text), model_id, array('f', embedding).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model_id, embedding, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._entries = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if self._entries > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (self._entries - self.max_entries,)
+                )
+                self._entries = self.max_entries
+            self.conn.commit()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for this process and the current cache size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._entries,
+            "max_entries": self.max_entries
+        }
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,124 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+class EmbeddingRetryQueue:
+    def __init__(self, path: str):
+        """
+        Initialize a persistent queue of documents whose embedding failed
+
+        Args:
+            path (str): SQLite file holding the pending documents
+        """
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                question_id TEXT NOT NULL,
+                section INTEGER NOT NULL,
+                document TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                enqueued_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (section, question_id)
+            )
+        """)
+        self.conn.commit()
+
+    def enqueue_many(self, section_num: int, items: List[Dict], error: str = None):
+        """
+        Record documents that still need an embedding
+
+        Args:
+            section_num (int): Section the documents belong to
+            items (List[Dict]): Dicts with 'id', 'document' and 'metadata' keys
+            error (str): Reason the embedding failed
+        """
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            for item in items:
+                # Keep the original enqueue time and attempt count when a document fails again
+                self.conn.execute(
+                    """
+                    INSERT INTO pending
+                        (question_id, section, document, metadata, attempts, last_error, enqueued_at, updated_at)
+                    VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (section, question_id) DO UPDATE SET
+                        document = excluded.document,
+                        metadata = excluded.metadata,
+                        attempts = attempts + 1,
+                        last_error = excluded.last_error,
+                        updated_at = excluded.updated_at
+                    """,
+                    (
+                        item['id'], section_num, item['document'],
+                        json.dumps(item['metadata'], ensure_ascii=False),
+                        error, now, now
+                    )
+                )
+            self.conn.commit()
+
+    def pending(self, section_num: int = None, limit: int = None) -> List[Dict]:
+        """Return queued documents, oldest first"""
+        query = "SELECT question_id, section, document, metadata, attempts, last_error FROM pending"
+        params = []
+        if section_num is not None:
+            query += " WHERE section = ?"
+            params.append(section_num)
+        query += " ORDER BY enqueued_at ASC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            {
+                "id": question_id,
+                "section": section,
+                "document": document,
+                "metadata": json.loads(metadata),
+                "attempts": attempts,
+                "last_error": last_error
+            }
+            for question_id, section, document, metadata, attempts, last_error in rows
+        ]
+
+    def remove_many(self, section_num: int, question_ids: List[str]):
+        """Drop documents that now have a real embedding"""
+        if not question_ids:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "DELETE FROM pending WHERE section = ? AND question_id = ?",
+                [(section_num, question_id) for question_id in question_ids]
+            )
+            self.conn.commit()
+
+    def count(self, section_num: int = None) -> int:
+        """Return the number of queued documents"""
+        with self._lock:
+            if section_num is None:
+                return self.conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM pending WHERE section = ?", (section_num,)
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,286 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote
+
+from backend.audio_assembly import silence_bytes
+from backend.hashing_embedding import hash_embedding
+from backend.rate_limit import TokenBucket
+from backend.synthetic_data import synthetic_question
+
+# Titan text embeddings v1 return 1536 dimensions
+EMBEDDING_DIMENSIONS = 1536
+
+# Roughly how long Polly takes to speak one character of Arabic
+MS_PER_CHARACTER = 60
+
+class FakeAWSServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        bedrock_latency_ms: float = 300,
+        polly_latency_ms: float = 150,
+        embedding_latency_ms: float = 30,
+        jitter_ms: float = 50,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_requests_per_second: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Stand-in for Bedrock runtime and Polly that speaks their REST protocols,
+        so the backend and boto3's retry logic run unchanged against it.
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind; 0 picks a free port
+            bedrock_latency_ms (float): Mean latency of converse calls
+            polly_latency_ms (float): Mean latency of synthesize_speech calls
+            embedding_latency_ms (float): Mean latency of invoke_model calls
+            jitter_ms (float): Latency is drawn uniformly from mean +/- jitter
+            error_rate (float): Fraction of requests failing with a 500
+            throttle_rate (float): Fraction of requests throttled at random with a 429
+            max_requests_per_second (float): Requests above this rate are throttled
+            max_concurrency (int): Requests beyond this many in flight are throttled
+            seed (int): Seed for latencies, failures and generated content
+        """
+        self.latency_ms = {
+            "converse": bedrock_latency_ms,
+            "invoke": embedding_latency_ms,
+            "speech": polly_latency_ms,
+        }
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limiter = TokenBucket(max_requests_per_second) if max_requests_per_second else None
+        self.max_concurrency = max_concurrency
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._prompt_cache = set()
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "by_operation": {}}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAWSServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def _admit(self, operation: str) -> Optional[Tuple[int, str]]:
+        """Decide whether a request is served; returns (status, error type) if it is rejected"""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["by_operation"][operation] = self.stats["by_operation"].get(operation, 0) + 1
+            throttled = (
+                (self.max_concurrency is not None and self._in_flight >= self.max_concurrency)
+                or (self.rate_limiter is not None and not self.rate_limiter.try_acquire())
+                or self._random.random() < self.throttle_rate
+            )
+            if throttled:
+                self.stats["throttled"] += 1
+                return 429, "ThrottlingException"
+            if self._random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 500, "ServiceFailureException" if operation == "speech" else "InternalServerException"
+            self._in_flight += 1
+            return None
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _sleep(self, operation: str, extra_ms: float = 0):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, self.latency_ms[operation] + extra_ms + jitter) / 1000)
+
+    def cache_system_prompt(self, system: str) -> bool:
+        """Remember a system prompt marked as a cache point; returns whether it was cached already"""
+        with self._lock:
+            cached = system in self._prompt_cache
+            self._prompt_cache.add(system)
+            return cached
+
+    def converse_reply(self, prompt: str) -> str:
+        """Answer the prompts the backend sends with something its parsers accept"""
+        with self._lock:
+            rng = random.Random(self._random.random())
+        if "Return only a JSON object with exactly these keys" in prompt:
+            question = synthetic_question(rng, 3 if '"Situation"' in prompt else 2)
+            question.pop("topic", None)
+            question["CorrectAnswer"] = rng.randint(1, 4)
+            question["Explanations"] = [
+                "This matches what the speakers say." if i + 1 == question["CorrectAnswer"]
+                else "The conversation does not say this."
+                for i in range(4)
+            ]
+            return json.dumps(question, ensure_ascii=False)
+        if "Provide feedback in JSON format" in prompt:
+            match = re.search(r"Correct Answer: (\d)", prompt)
+            correct_answer = int(match.group(1)) if match else rng.randint(1, 4)
+            selected = re.search(r"Selected Answer: (\d)", prompt)
+            return json.dumps({
+                "correct": bool(selected) and int(selected.group(1)) == correct_answer,
+                "explanation": "The speakers state the answer directly in the second line of the conversation.",
+                "correct_answer": correct_answer
+            })
+        if "audio script generator" in prompt:
+            return (
+                "Speaker: Announcer (Gender: male)\nText: استمع إلى المحادثة التالية وأجب عن السؤال\n---\n"
+                "Speaker: Man (Gender: male)\nText: عفواً، متى يصل القطار؟\n---\n"
+                "Speaker: Woman (Gender: female)\nText: يصل القطار بعد عشر دقائق\n---\n"
+                "Speaker: Announcer (Gender: male)\nText: السؤال: متى يصل القطار؟\n---"
+            )
+        return "مرحباً! كيف يمكنني مساعدتك في تعلم اللغة العربية؟"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("x-amzn-RequestId", f"fake-{time.time_ns()}")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_error(self, status: int, error_type: str):
+                body = json.dumps({"message": f"Fake {error_type}"}).encode('utf-8')
+                self._send(status, body, "application/json", {"x-amzn-ErrorType": error_type})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                path = unquote(self.path.split("?", 1)[0])
+                match = re.fullmatch(r"/model/(.+)/(converse|invoke)", path)
+                if match:
+                    operation = match.group(2)
+                elif path == "/v1/speech":
+                    operation = "speech"
+                else:
+                    self._send_error(404, "UnknownOperationException")
+                    return
+
+                rejected = server._admit(operation)
+                if rejected:
+                    self._send_error(*rejected)
+                    return
+                try:
+                    handler = getattr(self, f"_handle_{operation}")
+                    handler(json.loads(body or b"{}"))
+                finally:
+                    server._release()
+
+            def _handle_converse(self, request: Dict):
+                system = " ".join(block.get("text", "") for block in request.get("system", []))
+                prompt = " ".join(
+                    block.get("text", "")
+                    for message in request.get("messages", [])
+                    for block in message.get("content", [])
+                )
+                reply = server.converse_reply(system + " " + prompt)
+                input_tokens, output_tokens = max(1, len(system + prompt) // 4), max(1, len(reply) // 4)
+                usage = {"inputTokens": input_tokens, "outputTokens": output_tokens}
+                if any("cachePoint" in block for block in request.get("system", [])):
+                    # The system prompt is written to the cache once, then read from it
+                    cached = server.cache_system_prompt(system)
+                    usage["cacheReadInputTokens" if cached else "cacheWriteInputTokens"] = len(system) // 4
+                    if cached:
+                        usage["inputTokens"] -= len(system) // 4
+                # Output tokens dominate generation time, but long prompts take time to read too
+                server._sleep("converse", output_tokens * 2 + usage["inputTokens"] * 0.2)
+                self._send(200, json.dumps({
+                    "output": {"message": {"role": "assistant", "content": [{"text": reply}]}},
+                    "stopReason": "end_turn",
+                    "usage": {**usage, "totalTokens": input_tokens + output_tokens},
+                    "metrics": {"latencyMs": int(server.latency_ms["converse"])}
+                }, ensure_ascii=False).encode('utf-8'), "application/json")
+
+            def _handle_invoke(self, request: Dict):
+                text = request.get("inputText", "")
+                server._sleep("invoke")
+                self._send(200, json.dumps({
+                    "embedding": hash_embedding(text, EMBEDDING_DIMENSIONS),
+                    "inputTextTokenCount": max(1, len(text) // 4)
+                }).encode('utf-8'), "application/json")
+
+            def _handle_speech(self, request: Dict):
+                text = request.get("Text", "")
+                sample_rate = int(request.get("SampleRate") or 24000)
+                duration_ms = max(300, len(text) * MS_PER_CHARACTER)
+                server._sleep("speech")
+                self._send(200, silence_bytes(duration_ms, sample_rate), "audio/mpeg",
+                           {"x-amzn-RequestCharacters": str(len(text))})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Bedrock runtime and Polly endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4566)
+    parser.add_argument("--bedrock-latency-ms", type=float, default=300)
+    parser.add_argument("--polly-latency-ms", type=float, default=150)
+    parser.add_argument("--embedding-latency-ms", type=float, default=30)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests throttled at random")
+    parser.add_argument("--max-rps", type=float, default=None, help="throttle requests above this rate")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="throttle requests beyond this many in flight")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeAWSServer(
+        args.host, args.port,
+        bedrock_latency_ms=args.bedrock_latency_ms,
+        polly_latency_ms=args.polly_latency_ms,
+        embedding_latency_ms=args.embedding_latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_requests_per_second=args.max_rps,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed
+    )
+    print(f"Fake Bedrock/Polly listening on {server.url}")
+    print(f"Point the backend at it with: export FAKE_AWS_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
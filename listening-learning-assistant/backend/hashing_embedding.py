@@ -0,0 +1,31 @@
+import re
+import zlib
+from typing import List, Tuple
+
+# Diacritics (tashkeel), Quranic marks and tatweel carry no meaning for retrieval
+ARABIC_MARKS = re.compile(r'[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]')
+
+def normalize_arabic(text: str) -> str:
+    """Normalize Arabic spelling variants so they hash to the same n-grams"""
+    text = ARABIC_MARKS.sub('', text)
+    text = re.sub('[إأآٱ]', 'ا', text)
+    text = text.replace('ى', 'ي').replace('ة', 'ه')
+    return text.lower()
+
+def hash_embedding(text: str, dimensions: int = 512, ngram_range: Tuple[int, int] = (2, 4)) -> List[float]:
+    """
+    Hash word-bounded character n-grams into a signed, L2-normalized vector.
+    Kept free of chromadb so the fake Bedrock server can embed without the vector store.
+    """
+    vector = [0.0] * dimensions
+    for word in normalize_arabic(text).split():
+        padded = f" {word} "
+        for n in range(ngram_range[0], ngram_range[1] + 1):
+            for i in range(len(padded) - n + 1):
+                # crc32 is stable across processes, unlike the built-in hash()
+                digest = zlib.crc32(padded[i:i + n].encode('utf-8'))
+                vector[digest % dimensions] += 1.0 if digest & 0x80000000 else -1.0
+    norm = sum(value * value for value in vector) ** 0.5
+    if norm == 0:
+        return vector
+    return [value / norm for value in vector]
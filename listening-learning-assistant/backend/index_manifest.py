@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+# Bump when the indexed document or metadata layout changes to force a re-embed
+FINGERPRINT_VERSION = "2"
+
+def question_fingerprint(question: Dict) -> str:
+    """Hash the content of a question independently of key order"""
+    payload = json.dumps(question, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(f"{FINGERPRINT_VERSION}:{payload}".encode('utf-8')).hexdigest()
+
+class IndexManifest:
+    def __init__(self, path: str):
+        """
+        Initialize the manifest of indexed question fingerprints
+
+        Args:
+            path (str): SQLite file holding one content hash per indexed question
+        """
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                section INTEGER NOT NULL,
+                question_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (section, question_id)
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_fingerprints_video ON fingerprints (section, video_id)"
+        )
+        self.conn.commit()
+
+    def get_fingerprints(self, section_num: int, question_ids: List[str]) -> Dict[str, str]:
+        """Return the stored fingerprint for each known question id"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(question_ids), 500):
+                chunk = question_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT question_id, fingerprint FROM fingerprints "
+                    f"WHERE section = ? AND question_id IN ({placeholders})",
+                    [section_num, *chunk]
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def get_video_question_ids(self, section_num: int, video_id: str) -> List[str]:
+        """Return every question id indexed for a video"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT question_id FROM fingerprints WHERE section = ? AND video_id = ?",
+                (section_num, video_id)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_many(self, section_num: int, video_id: str, fingerprints: Dict[str, str]):
+        """Record the fingerprints of freshly indexed questions"""
+        if not fingerprints:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fingerprints (section, question_id, video_id, fingerprint) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (section_num, question_id, video_id, fingerprint)
+                    for question_id, fingerprint in fingerprints.items()
+                ]
+            )
+            self.conn.commit()
+
+    def remove_many(self, section_num: int, question_ids: List[str]):
+        """Forget questions that were deleted from the store"""
+        if not question_ids:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "DELETE FROM fingerprints WHERE section = ? AND question_id = ?",
+                [(section_num, question_id) for question_id in question_ids]
+            )
+            self.conn.commit()
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self.conn.close()
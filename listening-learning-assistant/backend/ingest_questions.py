@@ -0,0 +1,164 @@
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from backend.vector_store import EMBEDDING_BACKENDS, QuestionVectorStore, parse_questions_file
+
+QUESTION_FILE_PATTERN = re.compile(r"^(?P<video_id>.+)_section(?P<section>[23])\.txt$")
+
+def find_question_files(directory: str) -> List[Tuple[str, str, int]]:
+    """
+    Find every section 2/3 question file below a directory.
+    Question ids come from the video id and section, so when files in different
+    subdirectories share both, only the first by path is kept and the others are reported.
+
+    Returns:
+        List[Tuple[str, str, int]]: (filename, video_id, section_num) tuples, sorted by filename
+    """
+    files = []
+    seen = {}
+    for filename in sorted(glob.glob(os.path.join(directory, "**", "*_section*.txt"), recursive=True)):
+        match = QUESTION_FILE_PATTERN.match(os.path.basename(filename))
+        if match:
+            key = (match.group("video_id"), int(match.group("section")))
+            if key in seen:
+                print(f"Skipping {filename}: same video id and section as {seen[key]}")
+                continue
+            seen[key] = filename
+            files.append((filename, *key))
+    return files
+
+def ingest_directory(
+    store: QuestionVectorStore,
+    directory: str,
+    parse_workers: int = None,
+    chunk_size: int = 256
+) -> Dict:
+    """
+    Parse every question file in a process pool and index the results in bulk.
+    Returns a report with counts, per-phase timings and throughput.
+    """
+    report = {
+        "files": 0,
+        "unreadable": 0,
+        "questions": 0,
+        "indexed": 0,
+        "unchanged": 0,
+        "queued": 0,
+        "removed": 0,
+        "legacy": 0,
+        "parse_seconds": 0.0,
+        "index_seconds": 0.0
+    }
+
+    files = find_question_files(directory)
+    report["files"] = len(files)
+    if not files:
+        print(f"No *_section2.txt or *_section3.txt files found in {directory}")
+        return report
+
+    # Parsing is pure Python, so a process pool sidesteps the GIL
+    parse_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        chunksize = max(1, len(files) // ((parse_workers or os.cpu_count() or 1) * 4))
+        parsed = list(executor.map(parse_questions_file, [f[0] for f in files], chunksize=chunksize))
+    report["parse_seconds"] = time.perf_counter() - parse_start
+
+    batches_by_section = {2: [], 3: []}
+    empty_by_section = {2: [], 3: []}
+    for (filename, video_id, section_num), questions in zip(files, parsed):
+        if questions is None:
+            # Keep what was indexed from the file until it can be read again
+            print(f"Skipping {filename}: could not be read")
+            report["unreadable"] += 1
+            continue
+        if not questions:
+            print(f"Skipping {filename}: no questions parsed")
+            empty_by_section[section_num].append(video_id)
+            continue
+        batches_by_section[section_num].append((video_id, questions))
+        report["questions"] += len(questions)
+    print(f"Parsed {report['questions']} questions from {len(files)} files in {report['parse_seconds']:.2f}s")
+
+    index_start = time.perf_counter()
+    for section_num, video_ids in empty_by_section.items():
+        # Files that no longer have questions drop everything indexed from them before
+        for video_id in video_ids:
+            report["removed"] += store.remove_stale_questions(section_num, video_id, [])
+
+    for section_num, batches in batches_by_section.items():
+        if not batches:
+            continue
+
+        def _progress(done: int, total: int, section_num=section_num):
+            elapsed = time.perf_counter() - index_start
+            rate = done / elapsed if elapsed > 0 else 0.0
+            print(f"  section {section_num}: embedded {done}/{total} changed questions ({rate:.1f} q/s)")
+
+        stats = store.add_question_batches(section_num, batches, chunk_size=chunk_size, progress=_progress)
+        for key in ("indexed", "unchanged", "queued"):
+            report[key] += stats[key]
+
+        for video_id, questions in batches:
+            keep_ids = [store.make_question_id(video_id, section_num, idx) for idx in range(len(questions))]
+            report["removed"] += store.remove_stale_questions(section_num, video_id, keep_ids)
+    report["index_seconds"] = time.perf_counter() - index_start
+
+    # Re-indexed entries drop their full_structure blob; anything left was not in these files
+    report["legacy"] = sum(store.count_legacy_entries(section_num) for section_num in (2, 3))
+
+    total_seconds = report["parse_seconds"] + report["index_seconds"]
+    report["questions_per_second"] = report["questions"] / total_seconds if total_seconds > 0 else 0.0
+    report["embedded_per_second"] = (
+        report["indexed"] / report["index_seconds"] if report["index_seconds"] > 0 else 0.0
+    )
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest question files into the vector store")
+    parser.add_argument("directory", nargs="?", default="backend/data/questions",
+                        help="directory containing <video_id>_section{2,3}.txt files")
+    parser.add_argument("--persist-directory", default="backend/data/vectorstore",
+                        help="vector store location")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="parser processes (default: CPU count)")
+    parser.add_argument("--embedding-workers", type=int, default=16,
+                        help="concurrent embedding requests")
+    parser.add_argument("--embedding-backend", choices=EMBEDDING_BACKENDS, default=None,
+                        help="embedding backend (default: $EMBEDDING_BACKEND or bedrock)")
+    parser.add_argument("--chunk-size", type=int, default=256,
+                        help="questions per embedding batch and collection write")
+    args = parser.parse_args()
+
+    store = QuestionVectorStore(
+        args.persist_directory,
+        embedding_workers=args.embedding_workers,
+        embedding_backend=args.embedding_backend
+    )
+    report = ingest_directory(store, args.directory, args.parse_workers, args.chunk_size)
+
+    print("\nIngestion report")
+    print(f"  files:        {report['files']}")
+    if report["unreadable"]:
+        print(f"  unreadable:   {report['unreadable']} files skipped, their indexed questions were kept")
+    print(f"  questions:    {report['questions']}")
+    print(f"  embedded:     {report['indexed']}")
+    print(f"  unchanged:    {report['unchanged']}")
+    print(f"  queued:       {report['queued']}")
+    print(f"  removed:      {report['removed']}")
+    if report["legacy"]:
+        print(f"  legacy:       {report['legacy']} entries still store their body in Chroma metadata")
+    print(f"  parse time:   {report['parse_seconds']:.2f}s")
+    print(f"  index time:   {report['index_seconds']:.2f}s")
+    if report["files"]:
+        print(f"  throughput:   {report['questions_per_second']:.1f} questions/s overall, "
+              f"{report['embedded_per_second']:.1f} embedded/s")
+        cache_stats = store.get_embedding_cache_stats()
+        print(f"  cache:        {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# flock serializes processes; this serializes threads on platforms without it
+_thread_lock = threading.Lock()
+
+def write_json_atomic(path: str, data):
+    """Write JSON to a temp file next to path and rename it, so readers never see a partial file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on path across processes, e.g. the app and the pre-render job.
+    The lock lives on a sibling .lock file because atomic writes replace path itself.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with _thread_lock, open(f"{path}.lock", 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def update_json(path: str, update: Callable[[Any], Any], default: Callable[[], Any] = dict) -> Any:
+    """
+    Read-modify-write a JSON file under the cross-process lock.
+    update receives the current contents (default() if the file does not exist) and
+    returns the new contents, which are written atomically and returned.
+    """
+    with locked(path):
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        else:
+            data = default()
+        data = update(data)
+        write_json_atomic(path, data)
+        return data
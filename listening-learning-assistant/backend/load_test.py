@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from backend.metrics import percentiles
+
+OPERATIONS = ("generate_question", "feedback", "audio", "session")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Drive question generation, feedback and audio end to end against a fake or real AWS endpoint"
+    )
+    parser.add_argument("--url", default=None,
+                        help="endpoint to test against (default: start an embedded fake Bedrock/Polly server)")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=5, help="sessions run by each user")
+    parser.add_argument("--extended-feedback", type=float, default=0.2,
+                        help="fraction of answers that ask the model for a longer explanation")
+    parser.add_argument("--seed-questions", type=int, default=200, help="example questions seeded per section")
+    parser.add_argument("--bedrock-rate", type=float, default=0.0,
+                        help="client-side Bedrock converse requests per second, 0 to disable the limiter")
+    parser.add_argument("--embedding-rate", type=float, default=0.0,
+                        help="client-side Titan embedding requests per second, 0 to disable the limiter")
+    parser.add_argument("--polly-rate", type=float, default=0.0,
+                        help="client-side Polly requests per second, 0 to disable the limiter")
+    parser.add_argument("--no-prompt-budget", action="store_true",
+                        help="send retrieved examples in full, to compare tokens and latency against the budget")
+    parser.add_argument("--prompt-cache", action="store_true",
+                        help="mark static system prompts as Bedrock cache points")
+    parser.add_argument("--bedrock-latency-ms", type=float, default=300)
+    parser.add_argument("--polly-latency-ms", type=float, default=150)
+    parser.add_argument("--embedding-latency-ms", type=float, default=30)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake requests failing with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of fake requests throttled")
+    parser.add_argument("--max-rps", type=float, default=None, help="fake server throttles requests above this rate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None,
+                        help="results file (default: backend/data/benchmarks/load_test_<timestamp>.json)")
+    return parser.parse_args()
+
+async def run_session(generator, audio_generator, rng: random.Random, topics: List[str],
+                      extended_rate: float, samples: Dict[str, List[float]], failures: Dict[str, int]):
+    """One user's visit: get a question, answer it, listen to it"""
+    section_num = rng.choice((2, 3))
+    topic = rng.choice(topics)
+    session_start = time.perf_counter()
+
+    async def timed(operation: str, coro):
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except Exception as e:
+            failures[operation] += 1
+            print(f"{operation} failed: {str(e)}")
+            return None
+        if result is None:
+            failures[operation] += 1
+            return None
+        samples[operation].append(time.perf_counter() - start)
+        return result
+
+    question = await timed("generate_question", generator.agenerate_similar_question(section_num, topic))
+    if question is None:
+        failures["session"] += 1
+        return
+
+    feedback = await timed("feedback", generator.aget_feedback(
+        question, rng.randint(1, 4), extended=rng.random() < extended_rate
+    ))
+    audio_file = await timed("audio", audio_generator.agenerate_audio(question))
+    if feedback is None or audio_file is None:
+        failures["session"] += 1
+        return
+    samples["session"].append(time.perf_counter() - session_start)
+
+async def run_users(generator, audio_generator, users: int, sessions: int, topics: List[str],
+                    extended_rate: float, seed: int) -> Dict:
+    samples = {operation: [] for operation in OPERATIONS}
+    failures = {operation: 0 for operation in OPERATIONS}
+
+    async def user(user_idx: int):
+        rng = random.Random(seed + user_idx)
+        for _ in range(sessions):
+            await run_session(generator, audio_generator, rng, topics, extended_rate, samples, failures)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(idx) for idx in range(users)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seconds": elapsed,
+        "operations": {
+            operation: {
+                "completed": len(samples[operation]),
+                "failed": failures[operation],
+                "per_second": len(samples[operation]) / elapsed if elapsed > 0 else None,
+                **percentiles(samples[operation])
+            }
+            for operation in OPERATIONS
+        },
+    }
+
+def main():
+    args = parse_args()
+    # The shared limiters read their rates on import, so set them before importing any backend module
+    os.environ["BEDROCK_REQUESTS_PER_SECOND"] = str(args.bedrock_rate)
+    os.environ["EMBEDDING_REQUESTS_PER_SECOND"] = str(args.embedding_rate)
+    os.environ["POLLY_REQUESTS_PER_SECOND"] = str(args.polly_rate)
+    os.environ["BEDROCK_PROMPT_CACHE"] = "1" if args.prompt_cache else ""
+
+    server = None
+    if args.url is None:
+        from backend.fake_aws import FakeAWSServer
+        server = FakeAWSServer(
+            bedrock_latency_ms=args.bedrock_latency_ms,
+            polly_latency_ms=args.polly_latency_ms,
+            embedding_latency_ms=args.embedding_latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            max_requests_per_second=args.max_rps,
+            seed=args.seed
+        ).start()
+
+    os.environ["FAKE_AWS_URL"] = args.url or server.url
+
+    from backend.audio_generator import AudioGenerator
+    from backend.bedrock_client import IO_WORKERS
+    from backend.prompt_budget import PromptBudget
+    from backend.question_generator import QuestionGenerator
+    from backend.synthetic_data import TOPICS, synthetic_question
+    from backend.vector_store import QuestionVectorStore
+
+    work_dir = tempfile.mkdtemp(prefix="load_test_")
+    try:
+        print(f"Seeding {args.seed_questions} questions per section through {os.environ['FAKE_AWS_URL']}...")
+        rng = random.Random(args.seed)
+        store = QuestionVectorStore(os.path.join(work_dir, "vectorstore"), use_memory_index=True)
+        for section_num in (2, 3):
+            store.add_questions(
+                section_num,
+                [synthetic_question(rng, section_num) for _ in range(args.seed_questions)],
+                f"loadtest{section_num}"
+            )
+        store.rebuild_memory_index()
+
+        generator = QuestionGenerator(
+            vector_store=store,
+            prompt_budget=PromptBudget(None, None, None) if args.no_prompt_budget else None
+        )
+        audio_generator = AudioGenerator(
+            audio_dir=os.path.join(work_dir, "audio"),
+            segment_cache_dir=os.path.join(work_dir, "audio_cache")
+        )
+
+        print(f"Running {args.users} users x {args.sessions} sessions...")
+        run = asyncio.run(run_users(
+            generator, audio_generator, args.users, args.sessions, TOPICS, args.extended_feedback, args.seed
+        ))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if server is not None:
+            server.shutdown()
+
+    results = {
+        "benchmark": "load_test",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "io_workers": IO_WORKERS,
+        },
+        **run,
+        "generation": generator.get_generation_stats(),
+        "parse": audio_generator.get_parse_stats(),
+        "bedrock": generator.bedrock_client.metrics.report(),
+        "fake_server": server.get_stats() if server is not None else None,
+    }
+
+    print(f"\nLoad test: {args.users} users, {args.sessions} sessions each, {run['seconds']:.1f} s")
+    print(f"  {'operation':<20} {'done':>6} {'failed':>7} {'per s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for operation, entry in run["operations"].items():
+        if not entry["completed"]:
+            print(f"  {operation:<20} {0:>6} {entry['failed']:>7}")
+            continue
+        print(f"  {operation:<20} {entry['completed']:>6} {entry['failed']:>7} {entry['per_second']:>8.2f} "
+              f"{entry['p50_ms']:>9.1f} {entry['p95_ms']:>9.1f} {entry['p99_ms']:>9.1f}")
+    generation = results["generation"]
+    tokens = generation["tokens"]
+    if tokens["requests"]:
+        print(f"  generation tokens per request: {tokens['input_tokens_per_request']:.0f} in, "
+              f"{tokens['output_tokens_per_request']:.0f} out, "
+              f"{tokens['cache_read_input_tokens_per_request']:.0f} read from the prompt cache")
+    print(f"  example context: {generation['context_tokens_after']} of {generation['context_tokens_before']} "
+          f"estimated tokens kept, {generation['duplicates_removed']} duplicates removed, "
+          f"{generation['examples_dropped']} examples dropped, {generation['fields_truncated']} fields truncated")
+    if server is not None:
+        stats = results["fake_server"]
+        print(f"  fake server: {stats['requests']} requests, {stats['throttled']} throttled, {stats['errors']} errors")
+
+    output = args.output or os.path.join(
+        "backend", "data", "benchmarks", f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import prometheus_client
+except ImportError:  # Prometheus export is optional
+    prometheus_client = None
+
+logger = logging.getLogger("backend.metrics")
+
+# Seconds; spans a cached segment lookup up to a slow multi-attempt LLM parse
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# prometheus_client refuses to register the same metric twice in one process
+_prometheus_metrics = {}
+_prometheus_lock = threading.Lock()
+
+def _prometheus_metric(kind: str, name: str, documentation: str, labels):
+    with _prometheus_lock:
+        if name not in _prometheus_metrics:
+            if kind == "histogram":
+                _prometheus_metrics[name] = prometheus_client.Histogram(
+                    name, documentation, labels, buckets=HISTOGRAM_BUCKETS
+                )
+            else:
+                _prometheus_metrics[name] = prometheus_client.Counter(name, documentation, labels)
+        return _prometheus_metrics[name]
+
+def start_metrics_server(port: int) -> bool:
+    """Expose Prometheus metrics over HTTP. Returns False if prometheus_client is not installed"""
+    if prometheus_client is None:
+        print("prometheus_client is not installed, metrics will not be exported")
+        return False
+    prometheus_client.start_http_server(port)
+    return True
+
+def percentiles(samples) -> Dict[str, float]:
+    """Summarize duration samples in milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+class StageMetrics:
+    def __init__(self, namespace: str, max_samples: int = 10000):
+        """
+        Time the stages of a pipeline.
+        Every measurement is logged as one JSON line on the backend.metrics logger,
+        observed in a Prometheus histogram when prometheus_client is installed, and
+        aggregated in memory for report().
+
+        Args:
+            namespace (str): Prefix of the Prometheus metric names and the log events
+            max_samples (int): Most recent samples kept per stage for percentiles
+        """
+        self.namespace = namespace
+        self.max_samples = max_samples
+        self._stages: Dict[str, Dict] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        if prometheus_client is not None:
+            self._histogram = _prometheus_metric(
+                "histogram", f"{namespace}_stage_seconds",
+                "Duration of pipeline stages", ["stage", "status"]
+            )
+            self._counter = _prometheus_metric(
+                "counter", f"{namespace}_total",
+                "Pipeline counters such as bytes written", ["name"]
+            )
+        else:
+            self._histogram = None
+            self._counter = None
+
+    def observe(self, stage: str, seconds: float, status: str = "ok", **fields):
+        """Record one duration for a stage"""
+        with self._lock:
+            entry = self._stages.setdefault(stage, {
+                "count": 0, "errors": 0, "total_seconds": 0.0,
+                "samples": deque(maxlen=self.max_samples)
+            })
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["samples"].append(seconds)
+            if status == "error":
+                entry["errors"] += 1
+
+        if self._histogram is not None:
+            self._histogram.labels(stage=stage, status=status).observe(seconds)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "event": f"{self.namespace}.{stage}",
+                "seconds": round(seconds, 6),
+                "status": status,
+                **fields
+            }, ensure_ascii=False, default=str))
+
+    def increment(self, name: str, value: float = 1, **fields):
+        """Add to a counter, e.g. bytes written"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        if self._counter is not None:
+            self._counter.labels(name=name).inc(value)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "event": f"{self.namespace}.{name}",
+                "value": value,
+                **fields
+            }, ensure_ascii=False, default=str))
+
+    @contextmanager
+    def timer(self, stage: str, **fields) -> Iterator[Dict]:
+        """
+        Time the enclosed block as one observation of stage.
+        Yields a dict the block can add log fields to; setting "status" overrides
+        the default of "ok", and an exception records "error".
+        """
+        fields = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException:
+            fields["status"] = "error"
+            raise
+        finally:
+            status = fields.pop("status", "ok")
+            self.observe(stage, time.perf_counter() - start, status, **fields)
+
+    def report(self) -> Dict:
+        """Aggregate every stage and counter seen so far"""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": entry["count"],
+                    "errors": entry["errors"],
+                    "total_seconds": entry["total_seconds"],
+                    "mean_ms": entry["total_seconds"] / entry["count"] * 1000,
+                    **percentiles(entry["samples"])
+                }
+                for stage, entry in self._stages.items()
+            }
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def print_report(self):
+        """Print the aggregated report as a table"""
+        report = self.report()
+        print(f"\n{self.namespace} stage timings")
+        print(f"  {'stage':<26} {'count':>7} {'errors':>7} {'total s':>9} {'mean ms':>9} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for stage, entry in sorted(report["stages"].items(), key=lambda item: -item[1]["total_seconds"]):
+            print(f"  {stage:<26} {entry['count']:>7} {entry['errors']:>7} {entry['total_seconds']:>9.2f} "
+                  f"{entry['mean_ms']:>9.1f} {entry['p50_ms']:>9.1f} {entry['p95_ms']:>9.1f} {entry['p99_ms']:>9.1f}")
+        for name, value in sorted(report["counters"].items()):
+            print(f"  {name:<26} {value:>7g}")
+
+    def reset(self):
+        """Forget everything aggregated so far; Prometheus metrics keep counting"""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+def enable_json_logging(path: Optional[str] = None):
+    """Send metric events to stderr, or append them to a file, one JSON object per line"""
+    handler = logging.FileHandler(path, encoding='utf-8') if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
@@ -0,0 +1,210 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from backend.audio_generator import AudioGenerator
+from backend.json_file import update_json, write_json_atomic
+from backend.metrics import enable_json_logging, start_metrics_server
+from backend.question_store import QuestionBodyStore
+from backend.rate_limit import TokenBucket
+
+DEFAULT_QUESTIONS_FILE = os.path.join("backend", "data", "stored_questions.json")
+DEFAULT_PERSIST_DIRECTORY = os.path.join("backend", "data", "vectorstore")
+
+def record_audio_files(questions_file: str, audio_files: Dict[str, str]):
+    """
+    Set audio_file on stored questions.
+    The file is re-read under the same lock the app saves with, so questions
+    saved in the meantime are kept.
+    """
+    if not audio_files:
+        return
+
+    def _update(stored: Dict) -> Dict:
+        for question_id, audio_file in audio_files.items():
+            if question_id in stored:
+                stored[question_id]['audio_file'] = audio_file
+        return stored
+
+    update_json(questions_file, _update)
+
+def find_questions(questions_file: Optional[str], persist_directory: Optional[str]) -> List[Dict]:
+    """
+    Collect every question from the stored question bank and the vector store.
+    Returns jobs with the question, where it came from, and its stored id.
+    """
+    jobs = []
+    if questions_file and os.path.exists(questions_file):
+        with open(questions_file, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        for question_id, entry in stored.items():
+            jobs.append({
+                "source": "stored",
+                "id": question_id,
+                "question": entry["question"],
+                "audio_file": entry.get("audio_file")
+            })
+
+    if persist_directory:
+        # One body store per embedding backend; identical questions collapse onto one audio file later
+        for path in sorted(glob.glob(os.path.join(persist_directory, "questions*.sqlite3"))):
+            store = QuestionBodyStore(path)
+            try:
+                for section_num in (2, 3):
+                    for question_id, question in store.iter_section(section_num):
+                        jobs.append({
+                            "source": "vectorstore",
+                            "id": question_id,
+                            "question": question,
+                            "audio_file": None
+                        })
+            finally:
+                store.close()
+    return jobs
+
+def prerender(
+    generator: AudioGenerator,
+    jobs: List[Dict],
+    questions_file: Optional[str] = None,
+    workers: int = 4,
+    flush_every: int = 20,
+    limit: Optional[int] = None
+) -> Dict:
+    """
+    Render audio for every job that does not have it yet.
+    Audio files are content-addressed, so rendered questions are skipped on the next
+    run and an interrupted job resumes where it stopped. Audio paths of stored
+    questions are written back every flush_every renders and at the end.
+    Returns a report with counts, timings and throughput.
+    """
+    report = {
+        "questions": len(jobs),
+        "already_rendered": 0,
+        "rendered": 0,
+        "failed": 0,
+        "bytes": 0,
+        "seconds": 0.0,
+    }
+    start = time.perf_counter()
+
+    # Group jobs by output file so each distinct question is rendered once
+    pending: Dict[str, List[Dict]] = {}
+    recorded: Dict[str, str] = {}
+    for job in jobs:
+        audio_file = generator.get_question_audio_path(job["question"])
+        if os.path.exists(audio_file):
+            report["already_rendered"] += 1
+            if job["source"] == "stored" and job["audio_file"] != audio_file:
+                recorded[job["id"]] = audio_file
+            continue
+        pending.setdefault(audio_file, []).append(job)
+
+    targets = list(pending.items())
+    if limit is not None:
+        targets = targets[:limit]
+    report["pending"] = len(targets)
+    print(f"{len(jobs)} questions, {report['already_rendered']} already rendered, {len(targets)} to render")
+
+    if questions_file:
+        record_audio_files(questions_file, recorded)
+    recorded = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(generator.generate_audio, group[0]["question"]): group
+            for _, group in targets
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            group = futures[future]
+            try:
+                audio_file = future.result()
+            except Exception as e:
+                report["failed"] += 1
+                print(f"Failed to render {group[0]['source']}:{group[0]['id']}: {str(e)}")
+                continue
+
+            report["rendered"] += 1
+            report["bytes"] += os.path.getsize(audio_file)
+            for job in group:
+                if job["source"] == "stored":
+                    recorded[job["id"]] = audio_file
+
+            if questions_file and len(recorded) >= flush_every:
+                record_audio_files(questions_file, recorded)
+                recorded = {}
+            if done % 10 == 0 or done == len(targets):
+                elapsed = time.perf_counter() - start
+                print(f"  {done}/{len(targets)} done, {done / elapsed:.2f} questions/s")
+
+    if questions_file:
+        record_audio_files(questions_file, recorded)
+
+    report["seconds"] = time.perf_counter() - start
+    report["questions_per_second"] = report["rendered"] / report["seconds"] if report["seconds"] > 0 else None
+    report["parse"] = generator.get_parse_stats()
+    report["segment_cache"] = generator.segment_cache.stats()
+    report["stages"] = generator.metrics.report()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render audio for the stored question bank and the vector store")
+    parser.add_argument("--questions-file", default=DEFAULT_QUESTIONS_FILE)
+    parser.add_argument("--persist-directory", default=DEFAULT_PERSIST_DIRECTORY,
+                        help="vector store to render questions from")
+    parser.add_argument("--skip-vector-store", action="store_true", help="only render stored questions")
+    parser.add_argument("--workers", type=int, default=4, help="questions rendered in parallel")
+    parser.add_argument("--part-workers", type=int, default=4, help="Polly requests per question in parallel")
+    parser.add_argument("--polly-rate", type=float, default=8.0, help="Polly requests per second")
+    parser.add_argument("--bedrock-rate", type=float, default=2.0, help="Bedrock requests per second")
+    parser.add_argument("--limit", type=int, default=None, help="render at most this many questions")
+    parser.add_argument("--output", default=None, help="also write the report to this JSON file")
+    parser.add_argument("--metrics-log", nargs="?", const="-", default=None,
+                        help="log every stage timing as JSON lines to this file, or stderr if no file is given")
+    parser.add_argument("--prometheus-port", type=int, default=None,
+                        help="expose stage histograms for Prometheus on this port while rendering")
+    args = parser.parse_args()
+
+    if args.metrics_log:
+        enable_json_logging(None if args.metrics_log == "-" else args.metrics_log)
+    if args.prometheus_port:
+        start_metrics_server(args.prometheus_port)
+
+    generator = AudioGenerator(
+        max_workers=args.part_workers,
+        polly_rate_limiter=TokenBucket(args.polly_rate),
+        bedrock_rate_limiter=TokenBucket(args.bedrock_rate)
+    )
+    jobs = find_questions(
+        args.questions_file,
+        None if args.skip_vector_store else args.persist_directory
+    )
+    report = prerender(
+        generator,
+        jobs,
+        questions_file=args.questions_file if os.path.exists(args.questions_file) else None,
+        workers=args.workers,
+        limit=args.limit
+    )
+
+    print("\nPre-render report")
+    print(f"  questions:        {report['questions']}")
+    print(f"  already rendered: {report['already_rendered']}")
+    print(f"  rendered:         {report['rendered']}")
+    print(f"  failed:           {report['failed']}")
+    print(f"  audio written:    {report['bytes'] / 1e6:.1f} MB")
+    print(f"  elapsed:          {report['seconds']:.1f} s")
+    if report["questions_per_second"]:
+        print(f"  throughput:       {report['questions_per_second']:.2f} questions/s")
+    print(f"  LLM fallback:     {report['parse']['fallback_rate'] * 100:.1f}% of parses")
+    print(f"  segment cache:    {report['segment_cache']['hit_rate'] * 100:.1f}% hit rate")
+    generator.metrics.print_report()
+
+    if args.output:
+        write_json_atomic(args.output, report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from backend.conversation_parser import DIACRITICS, split_conversation
+
+# Arabic runs at roughly 3 characters per token on the Nova tokenizer; English at about 4.
+# Estimating with the lower figure keeps budgets on the safe side for both.
+CHARS_PER_TOKEN = 3.0
+
+# Fields of an example that are compared to spot near-identical examples
+CONTENT_FIELDS = ("Introduction", "Conversation", "Situation", "Question")
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many tokens a prompt costs without calling a tokenizer"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens at a word boundary, marking the cut with an ellipsis"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:int(max_tokens * CHARS_PER_TOKEN)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip() + " …"
+
+def truncate_conversation(conversation: str, max_tokens: int) -> str:
+    """
+    Keep the opening turns of a conversation that fit in max_tokens.
+    Whole turns are kept so the example still shows the speaker label format;
+    conversations whose speakers cannot be told apart are cut like plain text.
+    """
+    if estimate_tokens(conversation) <= max_tokens:
+        return conversation
+    parts = split_conversation(conversation)
+    if not parts:
+        return truncate_text(conversation, max_tokens)
+
+    turns = []
+    for speaker, speech, _ in parts:
+        turn = f"{speaker}: {speech}"
+        if turns and estimate_tokens(" ".join(turns + [turn])) > max_tokens:
+            break
+        turns.append(turn)
+    text = " ".join(turns)
+    if estimate_tokens(text) > max_tokens:
+        return truncate_text(text, max_tokens)
+    return text + " …" if len(turns) < len(parts) else text
+
+def _shingles(text: str, size: int = 3) -> set:
+    text = re.sub(r"\s+", " ", DIACRITICS.sub("", text)).strip()
+    return {text[i:i + size] for i in range(max(1, len(text) - size + 1))}
+
+def similarity(first: Dict, second: Dict) -> float:
+    """Jaccard similarity of the character trigrams of two questions' text"""
+    a = _shingles(" ".join(str(first.get(field, "")) for field in CONTENT_FIELDS))
+    b = _shingles(" ".join(str(second.get(field, "")) for field in CONTENT_FIELDS))
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+def dedupe_examples(examples: List[Dict], threshold: float) -> Tuple[List[Dict], int]:
+    """Drop examples that are near-copies of an earlier one; returns the kept examples and how many were dropped"""
+    kept = []
+    for example in examples:
+        if all(similarity(example, other) < threshold for other in kept):
+            kept.append(example)
+    return kept, len(examples) - len(kept)
+
+def format_example(section_num: int, idx: int, question: Dict) -> str:
+    """Render one retrieved question the way generation prompts show examples"""
+    text = f"Example {idx}:\n"
+    if section_num == 2:
+        text += f"Introduction: {question.get('Introduction', '')}\n"
+        text += f"Conversation: {question.get('Conversation', '')}\n"
+    else:  # section 3
+        text += f"Situation: {question.get('Situation', '')}\n"
+    text += f"Question: {question.get('Question', '')}\n"
+    if 'Options' in question:
+        text += "Options:\n"
+        for i, opt in enumerate(question['Options'], 1):
+            text += f"{i}. {opt}\n"
+    return text + "\n"
+
+class PromptBudget:
+    def __init__(
+        self,
+        max_context_tokens: Optional[int] = 600,
+        max_field_tokens: Optional[int] = 150,
+        dedupe_threshold: Optional[float] = 0.8
+    ):
+        """
+        Fit retrieved examples into a token budget before they go into a prompt.
+        Near-identical examples are dropped, long fields are truncated, and
+        examples that would push the context past the budget are left out.
+        Any limit set to None is not applied.
+
+        Args:
+            max_context_tokens (int): Estimated tokens allowed for all examples together
+            max_field_tokens (int): Estimated tokens allowed per example field, e.g. a conversation
+            dedupe_threshold (float): Trigram similarity at which two examples count as duplicates
+        """
+        self.max_context_tokens = max_context_tokens
+        self.max_field_tokens = max_field_tokens
+        self.dedupe_threshold = dedupe_threshold
+
+    def _trim(self, question: Dict) -> Tuple[Dict, int]:
+        if self.max_field_tokens is None:
+            return question, 0
+        trimmed, truncated = dict(question), 0
+        for field in CONTENT_FIELDS:
+            value = question.get(field)
+            if not isinstance(value, str):
+                continue
+            if field == "Conversation":
+                trimmed[field] = truncate_conversation(value, self.max_field_tokens)
+            else:
+                trimmed[field] = truncate_text(value, self.max_field_tokens)
+            truncated += trimmed[field] != value
+        return trimmed, truncated
+
+    def build_context(self, section_num: int, examples: List[Dict]) -> Tuple[str, Dict]:
+        """
+        Render examples as prompt context within the budget.
+        The first example is always kept so the model sees the format.
+        Returns the context and what budgeting did: duplicates removed, fields truncated,
+        examples dropped, and the estimated tokens before and after.
+        """
+        header = "Here are some example Arabic listening questions:\n\n"
+        unbudgeted = header + "".join(
+            format_example(section_num, idx, q) for idx, q in enumerate(examples, 1)
+        )
+
+        duplicates = 0
+        if self.dedupe_threshold is not None:
+            examples, duplicates = dedupe_examples(examples, self.dedupe_threshold)
+
+        context, truncated, kept = header, 0, 0
+        for question in examples:
+            question, fields_truncated = self._trim(question)
+            example = format_example(section_num, kept + 1, question)
+            if kept and self.max_context_tokens is not None and \
+                    estimate_tokens(context + example) > self.max_context_tokens:
+                break
+            context += example
+            truncated += fields_truncated
+            kept += 1
+
+        return context, {
+            "examples": kept,
+            "duplicates_removed": duplicates,
+            "examples_dropped": len(examples) - kept,
+            "fields_truncated": truncated,
+            "tokens_before": estimate_tokens(unbudgeted),
+            "tokens_after": estimate_tokens(context),
+        }
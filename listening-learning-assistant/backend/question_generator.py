@@ -1,17 +1,176 @@
-import boto3
+import asyncio
+import functools
 import json
-from typing import Dict, List, Optional
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+from backend.bedrock_client import TOKEN_COUNTERS, get_bedrock_client, run_blocking, system_blocks
+from backend.prompt_budget import PromptBudget
+from backend.question_schema import ANSWER_KEY_FIELDS, QUESTION_FIELDS
 from backend.vector_store import QuestionVectorStore
-from .transcript_extractor import ArabicTranscriptExtractor
+
+@functools.lru_cache(maxsize=None)
+def structured_system_prompt(section_num: int) -> str:
+    """
+    Instructions and schema for structured generation.
+    They are the same for every request in a section, so they are built once and sent
+    as the system prompt, where Bedrock can cache them when prompt caching is on.
+    """
+    schema = json.dumps(QUESTION_FIELDS[section_num], ensure_ascii=False, indent=2)
+    return f"""You write Arabic listening comprehension questions.
+Given example questions and a topic, create a new question about the topic.
+The question should follow the same pattern as the examples but be different from them.
+Ensure the question tests listening comprehension and has a clear correct answer.
+
+Return only a JSON object with exactly these keys, each holding the value described:
+{schema}"""
+
+def extract_json_object(text: str) -> Optional[Dict]:
+    """Parse the first JSON object in a model response, ignoring code fences and surrounding prose"""
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def validate_question(section_num: int, data: Dict) -> Tuple[Dict, List[str]]:
+    """
+    Keep the valid schema fields of a generated question.
+    Returns the valid fields and the names of fields that are missing or invalid.
+    """
+    # Models sometimes change the case of keys
+    by_name = {str(key).lower(): value for key, value in data.items()}
+    question, missing = {}, []
+    for field in QUESTION_FIELDS[section_num]:
+        value = by_name.get(field.lower())
+        if field in ANSWER_KEY_FIELDS and "Options" in missing:
+            # An answer key only makes sense for the options it was written for
+            missing.append(field)
+        elif field == "CorrectAnswer":
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                value = None
+            if value is not None and 1 <= value <= 4:
+                question[field] = value
+            else:
+                missing.append(field)
+        elif field == "Explanations":
+            if isinstance(value, list) and len(value) == 4 and all(isinstance(v, str) and v.strip() for v in value):
+                question[field] = [v.strip() for v in value]
+            else:
+                missing.append(field)
+        elif field == "Options":
+            if isinstance(value, list):
+                # Drop any numbering the model added despite the instructions
+                value = [re.sub(r'^\s*[0-9٠-٩]+[.)-]\s*', '', str(option)).strip() for option in value]
+            if (isinstance(value, list) and len(value) == 4
+                    and all(value) and len(set(value)) == 4):
+                question[field] = value
+            else:
+                missing.append(field)
+        elif isinstance(value, str) and value.strip():
+            question[field] = value.strip()
+        else:
+            missing.append(field)
+    return question, missing
+
+def grade_answer(question: Dict, selected_answer: int) -> Optional[Dict]:
+    """
+    Grade an answer against the answer key stored with the question.
+    Returns None if the question has no usable answer key.
+    """
+    correct_answer = question.get('CorrectAnswer')
+    explanations = question.get('Explanations') or []
+    if not isinstance(correct_answer, int) or not 1 <= correct_answer <= len(question.get('Options', [])):
+        return None
+
+    correct = selected_answer == correct_answer
+    parts = []
+    if 1 <= selected_answer <= len(explanations):
+        parts.append(explanations[selected_answer - 1])
+    if not correct and correct_answer <= len(explanations):
+        parts.append(f"Option {correct_answer}: {explanations[correct_answer - 1]}")
+    return {
+        "correct": correct,
+        "explanation": " ".join(parts) or ("Correct!" if correct else f"The correct answer is option {correct_answer}."),
+        "correct_answer": correct_answer
+    }
+
 class QuestionGenerator:
-    def __init__(self):
-        """Initialize Bedrock client and vector store"""
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
-        self.vector_store = QuestionVectorStore()
+    def __init__(
+        self,
+        structured_output: bool = True,
+        max_repairs: int = 2,
+        vector_store: Optional[QuestionVectorStore] = None,
+        prompt_budget: Optional[PromptBudget] = None
+    ):
+        """
+        Initialize Bedrock client and vector store.
+        With structured_output the model returns JSON that is validated in one pass,
+        and only missing or invalid fields are asked for again, up to max_repairs times.
+        Pass vector_store to draw examples from a store other than the default one,
+        e.g. one built with use_memory_index=True and shared by several generators.
+        Retrieved examples are deduplicated and trimmed to prompt_budget before every generation.
+        """
+        self.bedrock_client = get_bedrock_client()
+        self.vector_store = vector_store or QuestionVectorStore()
         self.model_id = "amazon.nova-lite-v1:0"
+        self.structured_output = structured_output
+        self.max_repairs = max_repairs
+        self.prompt_budget = prompt_budget or PromptBudget()
+        self.generation_stats = {
+            "bedrock_calls": 0, "questions": 0, "repairs": 0, "failures": 0,
+            "duplicates_removed": 0, "examples_dropped": 0, "fields_truncated": 0,
+            "context_tokens_before": 0, "context_tokens_after": 0,
+        }
+        # Usage of this generator's own generation responses; the shared client's counters
+        # also include feedback, conversation parsing and transcript structuring
+        self.token_stats = {"requests": 0, **{name: 0 for name in TOKEN_COUNTERS}}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str, value: int = 1):
+        with self._stats_lock:
+            self.generation_stats[name] += value
+
+    def _count_usage(self, usage: Dict):
+        with self._stats_lock:
+            self.token_stats["requests"] += 1
+            for name, key in TOKEN_COUNTERS.items():
+                self.token_stats[name] += usage.get(key) or 0
 
-    def _invoke_bedrock(self, prompt: str) -> Optional[str]:
-        """Invoke Bedrock with the given prompt"""
+    def get_generation_stats(self) -> Dict:
+        """
+        Return Bedrock calls, usable questions and the calls spent per usable question,
+        what prompt budgeting saved, and the tokens Bedrock reported for question
+        generation, in total and per request
+        """
+        with self._stats_lock:
+            stats = dict(self.generation_stats)
+            tokens = dict(self.token_stats)
+        stats["calls_per_question"] = (
+            stats["bedrock_calls"] / stats["questions"] if stats["questions"] else None
+        )
+        stats["context_tokens_saved"] = stats["context_tokens_before"] - stats["context_tokens_after"]
+        for name in TOKEN_COUNTERS:
+            tokens[f"{name}_per_request"] = tokens[name] / tokens["requests"] if tokens["requests"] else None
+        stats["tokens"] = tokens
+        return stats
+
+    def _invoke_bedrock(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        system: Optional[str] = None,
+        count_usage: bool = False
+    ) -> Optional[str]:
+        """
+        Invoke Bedrock with the given prompt, after an optional static system prompt.
+        With count_usage the tokens of the response are added to the generation stats.
+        """
         try:
             messages = [{
                 "role": "user",
@@ -23,8 +182,11 @@ class QuestionGenerator:
             response = self.bedrock_client.converse(
                 modelId=self.model_id,
                 messages=messages,
-                inferenceConfig={"temperature": 0.7}
+                inferenceConfig={"temperature": temperature},
+                **({"system": system_blocks(system)} if system else {})
             )
+            if count_usage and response.get('usage'):
+                self._count_usage(response['usage'])
             
             return response['output']['message']['content'][0]['text']
         except Exception as e:
@@ -35,31 +197,55 @@ class QuestionGenerator:
         """Generate a new question similar to existing ones on a given topic"""
         # Get similar questions for context
         similar_questions = self.vector_store.search_similar_questions(section_num, topic, n_results=3)
-        
+        return self._generate_from_examples(section_num, topic, similar_questions)
+
+    async def agenerate_similar_question(self, section_num: int, topic: str) -> Dict:
+        """generate_similar_question without blocking the event loop"""
+        return await run_blocking(self.generate_similar_question, section_num, topic)
+
+    def generate_similar_questions(self, section_num: int, topics: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Generate one new question per topic.
+        Example lookups for every topic share one embedding batch and one vector store query,
+        and no example is reused across topics.
+        """
+        examples = self.vector_store.search_similar_questions_batch(
+            section_num, topics, n_results=3, dedupe=True, mmr=True
+        )
+        return {
+            topic: self._generate_from_examples(section_num, topic, similar_questions)
+            for topic, similar_questions in zip(topics, examples)
+        }
+
+    async def agenerate_similar_questions(self, section_num: int, topics: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Generate one new question per topic with every Bedrock call in flight at once.
+        Example lookups are shared as in generate_similar_questions.
+        """
+        examples = await run_blocking(
+            self.vector_store.search_similar_questions_batch,
+            section_num, topics, n_results=3, dedupe=True, mmr=True
+        )
+        questions = await asyncio.gather(*(
+            run_blocking(self._generate_from_examples, section_num, topic, similar_questions)
+            for topic, similar_questions in zip(topics, examples)
+        ))
+        return dict(zip(topics, questions))
+
+    def _generate_from_examples(self, section_num: int, topic: str, similar_questions: List[Dict]) -> Optional[Dict]:
+        """Generate a new question on a topic using retrieved questions as examples"""
         if not similar_questions:
             return None
         
-        # Create context from similar questions
-        context = "Here are some example Arabic listening questions:\n\n"
-        for idx, q in enumerate(similar_questions, 1):
-            if section_num == 2:
-                context += f"Example {idx}:\n"
-                context += f"Introduction: {q.get('Introduction', '')}\n"
-                context += f"Conversation: {q.get('Conversation', '')}\n"
-                context += f"Question: {q.get('Question', '')}\n"
-                if 'Options' in q:
-                    context += "Options:\n"
-                    for i, opt in enumerate(q['Options'], 1):
-                        context += f"{i}. {opt}\n"
-            else:  # section 3
-                context += f"Example {idx}:\n"
-                context += f"Situation: {q.get('Situation', '')}\n"
-                context += f"Question: {q.get('Question', '')}\n"
-                if 'Options' in q:
-                    context += "Options:\n"
-                    for i, opt in enumerate(q['Options'], 1):
-                        context += f"{i}. {opt}\n"
-            context += "\n"
+        # Fit the examples into the token budget
+        context, budget = self.prompt_budget.build_context(section_num, similar_questions)
+        for name in ("duplicates_removed", "examples_dropped", "fields_truncated"):
+            self._count(name, budget[name])
+        self._count("context_tokens_before", budget["tokens_before"])
+        self._count("context_tokens_after", budget["tokens_after"])
+
+        if self.structured_output:
+            return self._generate_structured(section_num, topic, context)
 
         # Create prompt for generating new question
         prompt = f"""Based on the following Arabic listening question examples, create a new question about {topic}.
@@ -76,8 +262,10 @@ class QuestionGenerator:
         """
 
         # Generate new question
-        response = self._invoke_bedrock(prompt)
+        self._count("bedrock_calls")
+        response = self._invoke_bedrock(prompt, count_usage=True)
         if not response:
+            self._count("failures")
             return None
 
         # Parse the generated question
@@ -138,16 +326,70 @@ class QuestionGenerator:
                     "غير متأكد"  # Not sure
                 ]
             
+            self._count("questions")
             return question
         except Exception as e:
             print(f"Error parsing generated question: {str(e)}")
             return None
 
-    def get_feedback(self, question: Dict, selected_answer: int) -> Dict:
-        """Generate feedback for the selected answer"""
+    def _generate_structured(self, section_num: int, topic: str, context: str) -> Optional[Dict]:
+        """
+        Generate a question as JSON, then re-ask only for fields that are missing or invalid.
+        Repair prompts carry the requested fields' schema themselves and are sent without
+        the cached system prompt, so they never read from or write to the prompt cache.
+        """
+        fields = QUESTION_FIELDS[section_num]
+        # Only the examples and the topic change between requests
+        prompt = f"""{context}Create a new question about {topic}."""
+
+        self._count("bedrock_calls")
+        response = self._invoke_bedrock(prompt, system=structured_system_prompt(section_num), count_usage=True)
+        if not response:
+            self._count("failures")
+            return None
+        question, missing = validate_question(section_num, extract_json_object(response) or {})
+
+        for _ in range(self.max_repairs):
+            if not missing:
+                break
+            self._count("repairs")
+            requested = json.dumps({field: fields[field] for field in missing}, ensure_ascii=False, indent=2)
+            repair_prompt = f"""Here is an incomplete Arabic listening question about {topic}:
+            {json.dumps(question, ensure_ascii=False, indent=2)}
+            
+            Complete it. Return only a JSON object with exactly these keys, each holding the value described:
+            {requested}
+            """
+            self._count("bedrock_calls")
+            response = self._invoke_bedrock(repair_prompt, temperature=0.3, count_usage=True)
+            if not response:
+                break
+            # Fields that were already valid win over anything the repair returns
+            question, _ = validate_question(section_num, {**(extract_json_object(response) or {}), **question})
+            missing = [field for field in fields if field not in question]
+
+        if missing:
+            print(f"Generated question is missing fields: {', '.join(missing)}")
+            self._count("failures")
+            return None
+
+        # Keep the key order of the schema
+        self._count("questions")
+        return {field: question[field] for field in fields}
+
+    def get_feedback(self, question: Dict, selected_answer: int, extended: bool = False) -> Dict:
+        """
+        Generate feedback for the selected answer.
+        Questions with a stored answer key are graded locally; the LLM is only asked
+        for questions without one, or for a longer explanation when extended is set.
+        """
         if not question or 'Options' not in question:
             return None
 
+        graded = grade_answer(question, selected_answer)
+        if graded and not extended:
+            return graded
+
         # Create prompt for generating feedback
         prompt = f"""Based on the following listening question and selected answer, provide feedback on whether it is correct 
         and why. Make the explanation clear and concise.
@@ -165,24 +407,41 @@ class QuestionGenerator:
             prompt += f"{i}. {opt}\n"
         
         prompt += f"\nSelected Answer: {selected_answer}\n"
+        if graded:
+            prompt += f"Correct Answer: {graded['correct_answer']}\n"
         prompt += "\nProvide feedback in JSON format with the following fields:\n"
         prompt += "- correct: true/false\n"
-        prompt += "- explanation: brief explanation of why the answer is correct/incorrect\n"
+        if graded:
+            prompt += "- explanation: detailed explanation of why the answer is correct/incorrect, quoting the relevant Arabic\n"
+        else:
+            prompt += "- explanation: brief explanation of why the answer is correct/incorrect\n"
         prompt += "- correct_answer: number of the correct option (1-4)\n"
 
         # Get feedback
         response = self._invoke_bedrock(prompt)
         if not response:
-            return None
+            return graded
 
-        try:
-            # Parse the JSON response
-            feedback = json.loads(response.strip())
-            return feedback
-        except:
-            # If JSON parsing fails, return a basic response
+        # Parse the JSON response
+        feedback = extract_json_object(response)
+        if graded:
+            # The stored answer key stays authoritative; the model only adds detail
+            if feedback and feedback.get('explanation'):
+                graded['extended_explanation'] = feedback['explanation']
+            return graded
+        if feedback is None:
+            # If JSON parsing fails, return a basic response without guessing the answer
             return {
                 "correct": False,
                 "explanation": "Sorry, we couldn't generate detailed feedback. Please try again.",
-                "correct_answer": 1  # Default to first option
+                "correct_answer": None
             }
+        return feedback
+
+    async def aget_feedback(self, question: Dict, selected_answer: int, extended: bool = False) -> Dict:
+        """get_feedback without blocking the event loop; local grading returns without a thread hop"""
+        if question and 'Options' in question and not extended:
+            graded = grade_answer(question, selected_answer)
+            if graded:
+                return graded
+        return await run_blocking(self.get_feedback, question, selected_answer, extended)
@@ -0,0 +1,169 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Metadata fields that can be used to prefilter searches
+FILTER_FIELDS = ("section", "video_id", "topic")
+
+def max_marginal_relevance(
+    query_embedding: List[float],
+    candidate_embeddings: List[List[float]],
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """
+    Pick k candidates balancing relevance to the query against redundancy
+    with candidates already picked. Returns positions into candidate_embeddings.
+    lambda_mult of 1 is pure relevance, 0 is pure diversity.
+    """
+    if not len(candidate_embeddings) or k <= 0:
+        return []
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+
+    # Cosine similarity, guarding against zero vectors
+    candidate_norms = np.linalg.norm(candidates, axis=1)
+    candidate_norms[candidate_norms == 0] = 1.0
+    normalized = candidates / candidate_norms[:, None]
+    query_norm = np.linalg.norm(query) or 1.0
+    relevance = normalized @ (query / query_norm)
+    pairwise = normalized @ normalized.T
+
+    selected = [int(np.argmax(relevance))]
+    while len(selected) < min(k, len(candidates)):
+        redundancy = pairwise[:, selected].max(axis=1)
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+    return selected
+
+class InMemoryQuestionIndex:
+    def __init__(self):
+        """
+        Initialize an in-process exact nearest-neighbour index over questions.
+
+        Vectors live in one contiguous float32 matrix and question dicts are
+        decoded once, so a search is a single matrix-vector product with no
+        per-hit deserialization. Distances are squared L2, matching Chroma's
+        default space, so scores are comparable with the persistent store.
+        """
+        self.ids: List[str] = []
+        self.questions: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._columns = {field: np.empty(0, dtype=object) for field in FILTER_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def build(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict], questions: List[Dict]):
+        """Replace the index contents"""
+        self.ids = list(ids)
+        self.questions = list(questions)
+        self._positions = {question_id: i for i, question_id in enumerate(self.ids)}
+        if len(self.ids):
+            self._matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        else:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._sq_norms = np.einsum('ij,ij->i', self._matrix, self._matrix)
+        self._columns = {
+            field: np.array([metadata.get(field) for metadata in metadatas], dtype=object)
+            for field in FILTER_FIELDS
+        }
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict], questions: List[Dict]):
+        """Add or replace entries. Rebuilds the matrix, which is cheap next to the embedding call."""
+        self.remove(ids)
+        if not len(self.ids):
+            self.build(ids, embeddings, metadatas, questions)
+            return
+        current_metadatas = [
+            {field: self._columns[field][i] for field in FILTER_FIELDS} for i in range(len(self.ids))
+        ]
+        self.build(
+            self.ids + list(ids),
+            np.vstack([self._matrix, np.asarray(embeddings, dtype=np.float32)]),
+            current_metadatas + list(metadatas),
+            self.questions + list(questions)
+        )
+
+    def remove(self, ids: List[str]):
+        """Remove entries by id, ignoring unknown ids"""
+        drop = {self._positions[question_id] for question_id in ids if question_id in self._positions}
+        if not drop:
+            return
+        keep = np.array([i for i in range(len(self.ids)) if i not in drop], dtype=np.int64)
+        self.ids = [self.ids[i] for i in keep]
+        self.questions = [self.questions[i] for i in keep]
+        self._positions = {question_id: i for i, question_id in enumerate(self.ids)}
+        self._matrix = np.ascontiguousarray(self._matrix[keep]) if len(keep) else np.empty((0, 0), dtype=np.float32)
+        self._sq_norms = self._sq_norms[keep]
+        self._columns = {field: column[keep] for field, column in self._columns.items()}
+
+    def get(self, question_id: str) -> Optional[Dict]:
+        """Return a copy of the question stored under an id"""
+        position = self._positions.get(question_id)
+        if position is None:
+            return None
+        return dict(self.questions[position])
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Return the stored vectors for known ids, in the given order"""
+        return self._matrix[[self._positions[question_id] for question_id in ids]]
+
+    def _filter_mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Build a boolean mask from {field: value or [values]} filters"""
+        if not where:
+            return None
+        mask = np.ones(len(self.ids), dtype=bool)
+        for field, value in where.items():
+            if field not in self._columns:
+                raise ValueError(f"Cannot filter on '{field}', expected one of {', '.join(FILTER_FIELDS)}")
+            column = self._columns[field]
+            if isinstance(value, (list, tuple, set)):
+                mask &= np.isin(column, list(value))
+            else:
+                mask &= column == value
+        return mask
+
+    def search(
+        self,
+        query_embedding: List[float],
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> List[Tuple[str, Dict, float]]:
+        """
+        Return the n_results nearest questions as (id, question, distance) tuples,
+        closest first. Question dicts are copies and safe to modify.
+        """
+        if not len(self.ids) or n_results <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+
+        # Prefilter before scoring so filtered searches only touch matching rows
+        mask = self._filter_mask(where)
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            if not len(candidates):
+                return []
+            matrix, sq_norms = self._matrix[candidates], self._sq_norms[candidates]
+        else:
+            candidates = None
+            matrix, sq_norms = self._matrix, self._sq_norms
+
+        # ||q - x||^2 = ||q||^2 + ||x||^2 - 2 q.x
+        distances = sq_norms - 2.0 * (matrix @ query) + float(query @ query)
+
+        k = min(n_results, len(distances))
+        if k < len(distances):
+            top = np.argpartition(distances, k - 1)[:k]
+        else:
+            top = np.arange(len(distances))
+        top = top[np.argsort(distances[top], kind='stable')]
+
+        results = []
+        for i in top:
+            position = int(candidates[i]) if candidates is not None else int(i)
+            results.append((self.ids[position], dict(self.questions[position]), max(float(distances[i]), 0.0)))
+        return results
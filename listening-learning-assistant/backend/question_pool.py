@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from backend.metrics import StageMetrics
+from backend.question_generator import QuestionGenerator
+from backend.rate_limit import TokenBucket
+
+PoolKey = Tuple[int, str]
+
+class QuestionPool:
+    def __init__(
+        self,
+        generator: QuestionGenerator,
+        keys: Iterable[PoolKey] = (),
+        target_size: int = 5,
+        low_water: int = 2,
+        max_concurrency: int = 2,
+        rate_limiter: Optional[TokenBucket] = None,
+        miss_wait_seconds: float = 15.0,
+        metrics: Optional[StageMetrics] = None
+    ):
+        """
+        Keep ready-made questions per (section, topic) so requests never wait on the LLM.
+        A background worker refills a pool up to target_size once it drops to low_water,
+        with at most max_concurrency generations in flight, paced by rate_limiter.
+
+        Args:
+            generator (QuestionGenerator): Generates the questions
+            keys (Iterable[Tuple[int, str]]): (section, topic) pools to warm up on start
+            target_size (int): Questions kept ready per pool
+            low_water (int): Pool size at which a refill starts
+            max_concurrency (int): Background generations in flight across all pools
+            rate_limiter (TokenBucket): Paces background generations, 1 per second by default
+            miss_wait_seconds (float): How long a miss waits for an in-flight refill before generating itself
+            metrics (StageMetrics): Receives hit/miss counters and refill latencies
+        """
+        self.generator = generator
+        self.target_size = max(1, target_size)
+        self.low_water = min(max(0, low_water), self.target_size - 1)
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter or TokenBucket(1.0)
+        self.miss_wait_seconds = miss_wait_seconds
+        self.metrics = metrics or StageMetrics("question_pool")
+
+        self._pools: Dict[PoolKey, deque] = {}
+        self._inflight: Dict[PoolKey, int] = {}
+        self._refilling = set()
+        self._retry_at: Dict[PoolKey, float] = {}
+        self._failures: Dict[PoolKey, int] = {}
+        self._active = 0
+        self._next = 0
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread = None
+
+        for key in keys:
+            self._add_key(key)
+
+    def _add_key(self, key: PoolKey):
+        """Register a pool; callers hold the lock or run before the worker starts"""
+        if key not in self._pools:
+            self._pools[key] = deque()
+            self._inflight[key] = 0
+
+    def start(self):
+        """Start the background refill worker; a stopped pool can be started again"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop refilling; generations already in flight finish in the background"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get(self, section_num: int, topic: str) -> Optional[Dict]:
+        """
+        Return a ready question for a section and topic.
+        On a miss the question comes from an in-flight refill if one lands within
+        miss_wait_seconds, and is generated directly otherwise.
+        """
+        key = (section_num, topic)
+        start = time.perf_counter()
+        with self._cond:
+            self._add_key(key)
+            pool = self._pools[key]
+            if pool:
+                question = pool.popleft()
+                self.metrics.increment("hits", section=section_num, topic=topic)
+                self._cond.notify_all()
+                return question
+
+            self.metrics.increment("misses", section=section_num, topic=topic)
+            # A miss empties the pool, so make sure a refill starts right away
+            self._refilling.add(key)
+            self._retry_at.pop(key, None)
+            self._cond.notify_all()
+
+            deadline = start + self.miss_wait_seconds
+            while not pool and self._inflight[key] and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if pool:
+                question = pool.popleft()
+                self.metrics.observe("miss_wait", time.perf_counter() - start)
+                return question
+
+        with self.metrics.timer("miss_generate", section=section_num, topic=topic):
+            return self.generator.generate_similar_question(section_num, topic)
+
+    def _needs_refill(self, key: PoolKey, now: float) -> bool:
+        ready = len(self._pools[key])
+        if ready + self._inflight[key] >= self.target_size:
+            self._refilling.discard(key)
+            return False
+        if ready <= self.low_water:
+            self._refilling.add(key)
+        return key in self._refilling and now >= self._retry_at.get(key, 0.0)
+
+    def _next_key(self) -> Optional[PoolKey]:
+        """Pick the next pool to refill, round robin so one topic cannot starve the others"""
+        if self._active >= self.max_concurrency:
+            return None
+        keys = list(self._pools)
+        now = time.monotonic()
+        for offset in range(len(keys)):
+            key = keys[(self._next + offset) % len(keys)]
+            if self._needs_refill(key, now):
+                self._next = (self._next + offset + 1) % len(keys)
+                return key
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                key = self._next_key()
+                if key is None:
+                    # Woken by get() and finished refills; the timeout picks up expired backoffs
+                    self._cond.wait(timeout=1.0)
+                    continue
+                self._inflight[key] += 1
+                self._active += 1
+
+            self.metrics.observe("refill_rate_limit_wait", self.rate_limiter.acquire())
+            with self._cond:
+                # stop() sets _stopped under the lock before shutting the executor down
+                if not self._stopped:
+                    self._executor.submit(self._refill_one, key)
+                    continue
+                # stop() ran while this refill waited for the rate limiter
+                self._inflight[key] -= 1
+                self._active -= 1
+                self._cond.notify_all()
+                return
+
+    def _refill_one(self, key: PoolKey):
+        section_num, topic = key
+        question = None
+        start = time.perf_counter()
+        try:
+            question = self.generator.generate_similar_question(section_num, topic)
+        except Exception as e:
+            print(f"Error refilling question pool for {topic}: {str(e)}")
+        finally:
+            status = "ok" if question else "error"
+            self.metrics.observe("refill", time.perf_counter() - start, status, section=section_num, topic=topic)
+            with self._cond:
+                self._inflight[key] -= 1
+                self._active -= 1
+                if question:
+                    self._pools[key].append(question)
+                    self._failures.pop(key, None)
+                else:
+                    # Back off exponentially so a failing topic does not burn the rate limit
+                    failures = self._failures.get(key, 0) + 1
+                    self._failures[key] = failures
+                    self._retry_at[key] = time.monotonic() + min(60.0, 2 ** failures)
+                self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """Return pool sizes, hit rate, refill latencies and Bedrock calls per usable question"""
+        report = self.metrics.report()
+        hits = report["counters"].get("hits", 0)
+        misses = report["counters"].get("misses", 0)
+        with self._cond:
+            pools = {
+                f"{section_num}:{topic}": {"ready": len(pool), "inflight": self._inflight[(section_num, topic)]}
+                for (section_num, topic), pool in self._pools.items()
+            }
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "pools": pools,
+            "refill": report["stages"].get("refill", {}),
+            "miss_generate": report["stages"].get("miss_generate", {}),
+            "generation": self.generator.get_generation_stats(),
+        }
@@ -0,0 +1,32 @@
+from typing import Dict
+
+# Fields of the question itself, per section, with the description given to the model
+BASE_QUESTION_FIELDS = {
+    2: {
+        "Introduction": "Arabic sentence introducing the speakers and the setting",
+        "Conversation": "Arabic dialogue, every turn prefixed with its speaker label and a colon, e.g. الرجل: ... المرأة: ...",
+        "Question": "Arabic question about the conversation",
+        "Options": "exactly 4 distinct Arabic answer options, without numbering",
+    },
+    3: {
+        "Situation": "Arabic description of the situation the listener is in",
+        "Question": "Arabic question about what to say or do",
+        "Options": "exactly 4 distinct Arabic answer options, without numbering",
+    },
+}
+
+# The answer key is stored with every question, so grading never needs the model
+ANSWER_KEY_FIELDS = {
+    "CorrectAnswer": "number of the correct option, 1 to 4",
+    "Explanations": "exactly 4 short English explanations, one per option in order, saying why it is right or wrong",
+}
+
+# Fields a usable question must have, per section
+QUESTION_FIELDS = {
+    section_num: {**fields, **ANSWER_KEY_FIELDS}
+    for section_num, fields in BASE_QUESTION_FIELDS.items()
+}
+
+def without_answer_key(question: Dict) -> Dict:
+    """Return the question without its answer key, e.g. before showing it to a model that only voices it"""
+    return {key: value for key, value in question.items() if key not in ANSWER_KEY_FIELDS}
@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Tuple
+
+class QuestionBodyStore:
+    def __init__(self, path: str):
+        """
+        Initialize the side store holding full question bodies
+
+        The vector store only keeps ids and filterable fields in Chroma; the
+        question itself lives here as compact UTF-8 JSON keyed by question id.
+
+        Args:
+            path (str): SQLite file holding the question bodies
+        """
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS questions (
+                section INTEGER NOT NULL,
+                question_id TEXT NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (section, question_id)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def encode(question: Dict) -> str:
+        """Serialize a question without whitespace or \\u escapes, which double the size of Arabic text"""
+        return json.dumps(question, ensure_ascii=False, separators=(',', ':'))
+
+    def put_many(self, section_num: int, questions: Dict[str, Dict]):
+        """Store or replace question bodies by id"""
+        if not questions:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO questions (section, question_id, body) VALUES (?, ?, ?)",
+                [
+                    (section_num, question_id, self.encode(question))
+                    for question_id, question in questions.items()
+                ]
+            )
+            self.conn.commit()
+
+    def get_many(self, section_num: int, question_ids: List[str]) -> Dict[str, Dict]:
+        """Return the decoded bodies of every known id"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(question_ids), 500):
+                chunk = question_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT question_id, body FROM questions "
+                    f"WHERE section = ? AND question_id IN ({placeholders})",
+                    [section_num, *chunk]
+                ).fetchall()
+                for question_id, body in rows:
+                    found[question_id] = json.loads(body)
+        return found
+
+    def get(self, section_num: int, question_id: str):
+        """Return a single decoded body, or None"""
+        return self.get_many(section_num, [question_id]).get(question_id)
+
+    def iter_section(self, section_num: int) -> Iterator[Tuple[str, Dict]]:
+        """Yield (question_id, question) for every body in a section"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT question_id, body FROM questions WHERE section = ?", (section_num,)
+            ).fetchall()
+        for question_id, body in rows:
+            yield question_id, json.loads(body)
+
+    def remove_many(self, section_num: int, question_ids: List[str]):
+        """Delete question bodies by id"""
+        if not question_ids:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "DELETE FROM questions WHERE section = ? AND question_id = ?",
+                [(section_num, question_id) for question_id in question_ids]
+            )
+            self.conn.commit()
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self.conn.close()
@@ -1,6 +1,7 @@
 from typing import Optional, Dict, List
-import boto3
+import asyncio
 import os
+from backend.bedrock_client import get_bedrock_client, run_blocking
 
 # Model ID
 #MODEL_ID = "amazon.nova-micro-v1:0"
@@ -9,7 +10,7 @@ MODEL_ID = "amazon.nova-lite-v1:0"
 class TranscriptStructurer:
     def __init__(self, model_id: str = MODEL_ID):
         """Initialize Bedrock client"""
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
+        self.bedrock_client = get_bedrock_client()
         self.model_id = model_id
         self.prompts = {
             1: """Extract questions from section القسم 1 of this Arabic transcript where the answer can be determined solely from the conversation without needing visual aids.
@@ -123,19 +124,9 @@ class TranscriptStructurer:
     def _invoke_bedrock(self, prompt: str, transcript: str) -> Optional[str]:
         """Make a single call to Bedrock with the given prompt"""
         full_prompt = f"{prompt}\n\nHere's the transcript:\n{transcript}"
-        
-        messages = [{
-            "role": "user",
-            "content": [{"text": full_prompt}]
-        }]
 
         try:
-            response = self.bedrock_client.converse(
-                modelId=self.model_id,
-                messages=messages,
-                inferenceConfig={"temperature": 0}
-            )
-            return response['output']['message']['content'][0]['text']
+            return self.bedrock_client.converse_text(self.model_id, full_prompt, {"temperature": 0})
         except Exception as e:
             print(f"Error invoking Bedrock: {str(e)}")
             return None
@@ -150,6 +141,20 @@ class TranscriptStructurer:
                 results[section_num] = result
         return results
 
+    async def astructure_transcript(self, transcript: str) -> Dict[int, str]:
+        """Structure the transcript with the section prompts in flight at the same time"""
+        # Skipping section 1 for now
+        section_nums = list(range(2, 4))
+        responses = await asyncio.gather(*(
+            run_blocking(self._invoke_bedrock, self.prompts[section_num], transcript)
+            for section_num in section_nums
+        ))
+        return {
+            section_num: result
+            for section_num, result in zip(section_nums, responses)
+            if result
+        }
+
     def save_questions(self, structured_sections: Dict[int, str], base_filename: str) -> bool:
         """Save each section to a separate file"""
         try:
@@ -0,0 +1,37 @@
+import random
+from typing import Dict
+
+TOPICS = ["Daily Conversation", "Shopping", "Restaurant", "Travel", "School/Work",
+          "Announcements", "Instructions", "Weather Reports", "News Updates"]
+
+PLACES = ["المطعم", "السوق", "المحطة", "الجامعة", "المستشفى", "المكتبة", "الفندق", "المطار", "الحديقة", "المدرسة"]
+ITEMS = ["القهوة", "الشاي", "الخبز", "الكتاب", "التذكرة", "الدواء", "الحقيبة", "الهاتف", "الفطور", "الغداء"]
+TIMES = ["الساعة الثامنة", "الساعة العاشرة", "بعد الظهر", "في المساء", "يوم الخميس", "غداً صباحاً", "بعد ساعة"]
+NUMBERS = ["واحد", "اثنان", "ثلاثة", "أربعة", "خمسة", "ستة", "سبعة", "ثمانية", "تسعة", "عشرة"]
+SPEAKERS = [("الرجل", "المرأة"), ("الطالب", "الطالبة"), ("الموظف", "الزبونة"), ("المعلم", "المعلمة")]
+
+def synthetic_question(rng: random.Random, section_num: int) -> Dict:
+    """Build one deterministic, plausible-looking Arabic section 2 or 3 question"""
+    place, item, when = rng.choice(PLACES), rng.choice(ITEMS), rng.choice(TIMES)
+    count = rng.choice(NUMBERS)
+    options = rng.sample(TIMES, 4) if rng.random() < 0.5 else [f"{n} {item}" for n in rng.sample(NUMBERS, 4)]
+    question = {"topic": rng.choice(TOPICS), "Options": options}
+    if section_num == 2:
+        first, second = rng.choice(SPEAKERS)
+        lines = [
+            f"{first}: عفواً، هل يوجد {item} في {place}؟",
+            f"{second}: نعم، يوجد {count} فقط.",
+            f"{first}: متى يمكنني أن آتي؟",
+            f"{second}: تعال {when} من فضلك.",
+        ]
+        question.update({
+            "Introduction": f"{first} و{second} يتحدثان في {place}. كم {item} يوجد؟",
+            "Conversation": " ".join(lines[:rng.randint(2, 4)]),
+            "Question": f"كم {item} يوجد في {place}؟",
+        })
+    else:
+        question.update({
+            "Situation": f"أنت في {place} وتريد {item} {when}. ماذا تقول للموظف؟",
+            "Question": "ماذا تقول في هذا الموقف؟",
+        })
+    return question
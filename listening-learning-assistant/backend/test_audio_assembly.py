@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from backend.audio_assembly import (
+    Mp3Assembler,
+    iter_mp3_frames,
+    parse_frame_header,
+    side_info_length,
+    silence_bytes,
+    silent_frame,
+)
+
+def frames_of(data):
+    return [info for _, info in iter_mp3_frames(data)]
+
+def test_silent_frame_parses_as_its_own_format():
+    for sample_rate, channels, samples_per_frame in [(24000, 1, 576), (44100, 2, 1152), (16000, 1, 576)]:
+        frame = silent_frame(sample_rate, channels)
+        frame_length, parsed_rate, parsed_channels, parsed_samples = parse_frame_header(frame, 0)
+        assert frame_length == len(frame)
+        assert (parsed_rate, parsed_channels, parsed_samples) == (sample_rate, channels, samples_per_frame)
+
+def test_silent_frame_rejects_unsupported_sample_rate():
+    with pytest.raises(ValueError):
+        silent_frame(23000, 1)
+
+def test_parse_frame_header_rejects_non_frames():
+    assert parse_frame_header(b"\x00\x00\x00\x00", 0) is None
+    assert parse_frame_header(b"\xff\xfb", 0) is None
+    # Layer II sync is not a Layer III frame
+    assert parse_frame_header(bytes([0xFF, 0xFD, 0x90, 0xC0]), 0) is None
+
+def test_silence_bytes_covers_the_duration_in_whole_frames():
+    data = silence_bytes(1000, 24000, 1)
+    frames = frames_of(data)
+    # 576 samples per frame at 24 kHz: one second is about 42 frames
+    assert len(frames) == round(24000 / 576)
+    assert len(data) == len(frames) * len(silent_frame(24000, 1))
+
+def test_iter_mp3_frames_skips_tags_and_resynchronizes():
+    frame = silent_frame(24000, 1)
+    id3v2 = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"\x00" * 5
+    id3v1 = b"TAG" + b"\x00" * 125
+    data = id3v2 + frame + b"\x00\x12garbage" + frame * 2 + id3v1
+    assert len(frames_of(data)) == 3
+
+def test_iter_mp3_frames_drops_xing_header_frames():
+    frame = silent_frame(24000, 1)
+    tag_offset = 4 + side_info_length(24000, 1)
+    xing = frame[:tag_offset] + b"Xing" + frame[tag_offset + 4:]
+    assert len(frames_of(xing + frame * 2)) == 2
+
+def test_assembler_matches_silence_to_the_appended_audio():
+    assembler = Mp3Assembler(sample_rate=24000, channels=1)
+    assembler.append_bytes(silence_bytes(100, 22050, 2))
+    assembler.append_silence(500)
+    rates = {(sample_rate, channels) for _, sample_rate, channels, _ in frames_of(assembler.to_bytes())}
+    assert rates == {(22050, 2)}
+
+def test_assembler_concatenates_in_order(tmp_path):
+    first = silence_bytes(100, 24000, 1)
+    second = silence_bytes(200, 24000, 1)
+    path = tmp_path / "part.mp3"
+    path.write_bytes(second)
+
+    assembler = Mp3Assembler()
+    assembler.append_bytes(first)
+    assembler.append_silence(300)
+    assembler.append_file(str(path))
+    data = assembler.to_bytes()
+    assert data.startswith(first)
+    assert data.endswith(second)
+    assert len(frames_of(data)) == len(frames_of(first)) + len(frames_of(silence_bytes(300))) + len(frames_of(second))
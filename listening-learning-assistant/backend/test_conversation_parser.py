@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.conversation_parser import (
+    conversation_parts_error,
+    has_arabic,
+    parse_question_locally,
+    speaker_gender,
+    split_conversation,
+)
+
+def test_speaker_gender_uses_lexicon_then_taa_marbuta():
+    assert speaker_gender('الرجل') == 'male'
+    assert speaker_gender('المرأة') == 'female'
+    assert speaker_gender('فاطمةُ') == 'female'
+    assert speaker_gender('المهندسة') == 'female'
+    assert speaker_gender('المهندس') == 'male'
+    assert speaker_gender('المهندس', guess=False) is None
+    assert speaker_gender('ملاحظة') is None
+
+def test_split_conversation_on_lines_and_sentences():
+    assert split_conversation("الرجل: مرحبا.\nالمرأة: أهلا بك.") == [
+        ('الرجل', 'مرحبا.', 'male'),
+        ('المرأة', 'أهلا بك.', 'female'),
+    ]
+    assert split_conversation("الطالب: أين المكتبة؟ الطالبة: في الطابق الثاني.") == [
+        ('الطالب', 'أين المكتبة؟', 'male'),
+        ('الطالبة', 'في الطابق الثاني.', 'female'),
+    ]
+
+def test_split_conversation_rejects_unattributed_speech():
+    assert split_conversation("مرحبا بكم") is None
+    assert split_conversation("صباح الخير. الرجل: مرحبا.") is None
+    assert split_conversation("الرجل: \nالمرأة: أهلا.") is None
+
+def test_split_conversation_leaves_reported_speech_to_the_llm():
+    assert split_conversation("الرجل: قال الطبيب: خذ الدواء") is None
+    # An unknown word before a colon mid-sentence is just part of the speech
+    assert split_conversation("الرجل: الوقت الآن: الساعة الثالثة.") == [
+        ('الرجل', 'الوقت الآن: الساعة الثالثة.', 'male'),
+    ]
+
+def test_parse_question_locally_builds_the_audio_layout():
+    parts = parse_question_locally({
+        'Introduction': 'رجل وامرأة يتحدثان في المطعم.',
+        'Conversation': 'الرجل: ماذا تريدين؟\nالمرأة: أريد القهوة.',
+        'Question': 'ماذا تريد المرأة؟',
+    })
+    assert parts == [
+        ('Announcer', 'استمع إلى المحادثة التالية. رجل وامرأة يتحدثان في المطعم.', 'male'),
+        ('الرجل', 'ماذا تريدين؟', 'male'),
+        ('المرأة', 'أريد القهوة.', 'female'),
+        ('Announcer', 'السؤال: ماذا تريد المرأة؟', 'male'),
+    ]
+    assert conversation_parts_error(parts) is None
+
+def test_parse_question_locally_reads_announcements_as_the_announcer():
+    parts = parse_question_locally({
+        'Situation': 'استمع إلى الإعلان في المطار.',
+        'Question': 'السؤال: أين الإعلان؟',
+    })
+    assert parts == [
+        ('Announcer', 'استمع إلى الإعلان في المطار.', 'male'),
+        ('Announcer', 'السؤال: أين الإعلان؟', 'male'),
+    ]
+
+def test_parse_question_locally_falls_back_on_unusual_questions():
+    assert parse_question_locally({'Introduction': 'مقدمة.', 'Question': 'سؤال؟'}) is None
+    assert parse_question_locally({'Introduction': 'مقدمة.', 'Conversation': 'حديث بلا متحدث', 'Question': 'سؤال؟'}) is None
+    # The Arabic listening cue must not hide an English introduction
+    assert parse_question_locally({
+        'Introduction': 'A man and a woman.',
+        'Conversation': 'الرجل: مرحبا.',
+        'Question': 'سؤال؟',
+    }) is None
+
+def test_conversation_parts_error_reports_the_first_problem():
+    assert conversation_parts_error([]) == "No conversation parts generated"
+    assert conversation_parts_error([('الرجل', 'مرحبا', 'male')]) == "First speaker must be Announcer"
+    assert conversation_parts_error([('Announcer', 'مرحبا', 'robot')]) == "Invalid gender in part 1: robot"
+    assert conversation_parts_error([('Announcer', 'hello', 'male')]).startswith("Text does not contain Arabic")
+    assert has_arabic('hello مرحبا') and not has_arabic('hello')
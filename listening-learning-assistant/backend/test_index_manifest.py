@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from backend.index_manifest import IndexManifest, question_fingerprint
+from backend.vector_store import QuestionVectorStore
+
+QUESTIONS = [
+    ("رجل وامرأة يتحدثان. متى يصل القطار؟", "الرجل: متى يصل القطار؟", "متى يصل القطار؟"),
+    ("طالب وطالبة يتحدثان. أين الكتاب؟", "الطالبة: أين الكتاب؟", "أين الكتاب؟"),
+    ("موظف وزبونة يتحدثان. كم السعر؟", "الزبونة: كم السعر؟", "كم السعر؟"),
+]
+
+def write_questions(path, questions):
+    with open(path, 'w', encoding='utf-8') as f:
+        for introduction, conversation, question in questions:
+            f.write(f"<question>\nIntroduction:\n{introduction}\n\nConversation:\n{conversation}\n\n"
+                    f"Question:\n{question}\nOptions:\n1. أ\n2. ب\n3. ج\n4. د\n</question>\n\n")
+
+@pytest.fixture
+def store(tmp_path):
+    return QuestionVectorStore(str(tmp_path / "vectorstore"), embedding_backend="hashing")
+
+def test_fingerprint_ignores_key_order_but_not_content():
+    question = {"Question": "متى؟", "Options": ["أ", "ب"]}
+    assert question_fingerprint(question) == question_fingerprint(dict(reversed(list(question.items()))))
+    assert question_fingerprint(question) != question_fingerprint({**question, "Question": "أين؟"})
+
+def test_manifest_tracks_fingerprints_per_video(tmp_path):
+    manifest = IndexManifest(str(tmp_path / "manifest.sqlite"))
+    manifest.set_many(2, "video", {"video_s2_q0": "a", "video_s2_q1": "b"})
+    manifest.set_many(2, "other", {"other_s2_q0": "c"})
+    assert manifest.get_fingerprints(2, ["video_s2_q0", "missing"]) == {"video_s2_q0": "a"}
+    assert sorted(manifest.get_video_question_ids(2, "video")) == ["video_s2_q0", "video_s2_q1"]
+    assert manifest.get_video_question_ids(3, "video") == []
+
+    manifest.remove_many(2, ["video_s2_q1"])
+    assert manifest.get_video_question_ids(2, "video") == ["video_s2_q0"]
+    manifest.close()
+
+def test_reindex_only_embeds_changed_questions(store, tmp_path):
+    path = str(tmp_path / "video_section2.txt")
+    write_questions(path, QUESTIONS)
+    assert store.index_questions_file(path, 2)["indexed"] == 3
+
+    stats = store.index_questions_file(path, 2)
+    assert (stats["indexed"], stats["unchanged"], stats["removed"]) == (0, 3, 0)
+
+    edited = list(QUESTIONS)
+    edited[1] = (edited[1][0], edited[1][1], "أين وضعت الكتاب؟")
+    write_questions(path, edited)
+    stats = store.index_questions_file(path, 2)
+    assert (stats["indexed"], stats["unchanged"]) == (1, 2)
+    assert store.get_question_by_id(2, store.make_question_id("video", 2, 1))["Question"] == "أين وضعت الكتاب؟"
+
+def test_questions_dropped_from_a_file_are_removed(store, tmp_path):
+    path = str(tmp_path / "video_section2.txt")
+    write_questions(path, QUESTIONS)
+    store.index_questions_file(path, 2)
+
+    write_questions(path, QUESTIONS[:1])
+    assert store.index_questions_file(path, 2)["removed"] == 2
+    assert store.manifest.get_video_question_ids(2, "video") == [store.make_question_id("video", 2, 0)]
+
+    write_questions(path, [])
+    assert store.index_questions_file(path, 2)["removed"] == 1
+    assert store.manifest.get_video_question_ids(2, "video") == []
+
+def test_unreadable_or_half_written_file_keeps_its_entries(store, tmp_path):
+    path = str(tmp_path / "video_section2.txt")
+    write_questions(path, QUESTIONS)
+    store.index_questions_file(path, 2)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text[:len(text) // 2])
+    assert store.index_questions_file(path, 2)["removed"] == 0
+
+    with open(path, 'wb') as f:
+        f.write(b"\xff\xfe not utf-8")
+    assert store.index_questions_file(path, 2)["removed"] == 0
+    assert len(store.manifest.get_video_question_ids(2, "video")) == 3
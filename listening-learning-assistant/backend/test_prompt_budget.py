@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.prompt_budget import (
+    PromptBudget,
+    dedupe_examples,
+    estimate_tokens,
+    format_example,
+    similarity,
+    truncate_conversation,
+    truncate_text,
+)
+
+def example(question, conversation="الرجل: مرحبا.\nالمرأة: أهلا بك."):
+    return {
+        "Introduction": "رجل وامرأة يتحدثان.",
+        "Conversation": conversation,
+        "Question": question,
+        "Options": ["أ", "ب", "ج", "د"],
+    }
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("abcd") == 2
+
+def test_truncate_text_cuts_at_a_word_boundary():
+    text = "كلمة " * 20
+    assert truncate_text(text, 100) == text
+    cut = truncate_text(text, 5)
+    assert cut.endswith(" …")
+    assert cut[:-2] == "كلمة كلمة كلمة"
+
+def test_truncate_conversation_keeps_whole_turns():
+    conversation = "الرجل: أين المحطة؟\nالمرأة: المحطة قريبة من هنا.\nالرجل: شكرا جزيلا لك على المساعدة."
+    assert truncate_conversation(conversation, 100) == conversation
+    assert truncate_conversation(conversation, 18) == "الرجل: أين المحطة؟ المرأة: المحطة قريبة من هنا. …"
+    # Without speaker labels it is cut like plain text
+    assert truncate_conversation("حديث طويل بلا متحدثين " * 5, 5).endswith(" …")
+
+def test_similarity_ignores_diacritics():
+    assert similarity({"Question": "ماذا تُريدُ؟"}, {"Question": "ماذا تريد؟"}) == 1.0
+    assert similarity(example("أين المحطة؟"), example("كم ثمن التذكرة في القطار السريع؟")) < 0.8
+
+def test_dedupe_examples_keeps_the_first_copy():
+    first, copy, other = example("أين المحطة؟"), example("أين المحطة؟"), example("كم ثمن التذكرة في القطار السريع؟")
+    kept, dropped = dedupe_examples([first, copy, other], 0.8)
+    assert kept == [first, other]
+    assert dropped == 1
+
+def test_format_example_by_section():
+    text = format_example(3, 2, {"Situation": "أنت في المطار.", "Question": "ماذا تقول؟", "Options": ["أ", "ب"]})
+    assert text == "Example 2:\nSituation: أنت في المطار.\nQuestion: ماذا تقول؟\nOptions:\n1. أ\n2. ب\n\n"
+    assert "Conversation: الرجل: مرحبا." in format_example(2, 1, example("سؤال؟"))
+
+def test_build_context_dedupes_and_reports():
+    examples = [example("أين المحطة؟"), example("أين المحطة؟"), example("كم ثمن التذكرة في القطار السريع؟")]
+    context, stats = PromptBudget().build_context(2, examples)
+    assert context.startswith("Here are some example Arabic listening questions:\n\nExample 1:")
+    assert "Example 2:" in context and "Example 3:" not in context
+    assert stats["examples"] == 2 and stats["duplicates_removed"] == 1 and stats["examples_dropped"] == 0
+    assert stats["tokens_after"] == estimate_tokens(context) < stats["tokens_before"]
+
+def test_build_context_drops_examples_over_budget_but_keeps_the_first():
+    long_conversation = "الرجل: " + "كلام " * 200
+    examples = [example("أين المحطة؟", long_conversation), example("كم ثمن التذكرة في القطار السريع؟")]
+    context, stats = PromptBudget(max_context_tokens=50, max_field_tokens=None).build_context(2, examples)
+    assert "Example 1:" in context and "Example 2:" not in context
+    assert (stats["examples"], stats["examples_dropped"], stats["fields_truncated"]) == (1, 1, 0)
+
+    context, stats = PromptBudget(max_context_tokens=None, max_field_tokens=20).build_context(2, examples)
+    assert stats["examples"] == 2 and stats["fields_truncated"] == 1
+    assert estimate_tokens(context) < estimate_tokens(long_conversation)
+
+def test_build_context_without_limits_is_unchanged():
+    examples = [example("أين المحطة؟"), example("أين المحطة؟")]
+    context, stats = PromptBudget(None, None, None).build_context(2, examples)
+    assert stats["tokens_after"] == stats["tokens_before"]
+    assert (stats["examples"], stats["duplicates_removed"]) == (2, 0)
@@ -0,0 +1,124 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import pytest
+
+from backend.question_generator import QuestionGenerator, extract_json_object, grade_answer, validate_question
+from backend.question_schema import without_answer_key
+from backend.vector_store import QuestionVectorStore
+
+QUESTION = {
+    "Introduction": "رجل وامرأة يتحدثان في المطعم.",
+    "Conversation": "الرجل: ماذا تريدين؟\nالمرأة: أريد القهوة.",
+    "Question": "ماذا تريد المرأة؟",
+    "Options": ["الشاي", "القهوة", "الماء", "العصير"],
+    "CorrectAnswer": 2,
+    "Explanations": ["She asks for coffee.", "Correct, she wants coffee.", "Water is not mentioned.", "Juice is not mentioned."],
+}
+
+@pytest.fixture
+def generator(tmp_path):
+    store = QuestionVectorStore(str(tmp_path / "vectorstore"), embedding_backend="hashing")
+    return QuestionGenerator(vector_store=store, max_repairs=2)
+
+def script_responses(generator, responses):
+    """Replace Bedrock with canned responses and record the prompts sent"""
+    prompts = []
+
+    def invoke(prompt, temperature=0.7, system=None, count_usage=False):
+        prompts.append(prompt)
+        return responses.pop(0) if responses else None
+
+    generator._invoke_bedrock = invoke
+    return prompts
+
+def test_extract_json_object_ignores_fences_and_prose():
+    assert extract_json_object('Here you go:\n```json\n{"a": 1}\n```') == {"a": 1}
+    assert extract_json_object('no json here') is None
+    assert extract_json_object('{"a": ') is None
+    assert extract_json_object('[1, 2]') is None
+
+def test_validate_question_normalizes_fields():
+    data = {key.lower(): value for key, value in QUESTION.items()}
+    data["options"] = ["1. الشاي", "2) القهوة", "٣- الماء", "العصير"]
+    data["correctanswer"] = "2"
+    question, missing = validate_question(2, data)
+    assert missing == []
+    assert question == QUESTION
+
+def test_validate_question_reports_invalid_fields():
+    question, missing = validate_question(2, {**QUESTION, "Options": ["أ", "أ", "ب", "ج"], "Question": " "})
+    # The answer key is dropped along with the options it was written for
+    assert missing == ["Question", "Options", "CorrectAnswer", "Explanations"]
+    assert set(question) == {"Introduction", "Conversation"}
+
+    _, missing = validate_question(2, {**QUESTION, "CorrectAnswer": 5, "Explanations": ["too few"]})
+    assert missing == ["CorrectAnswer", "Explanations"]
+
+def test_structured_generation_repairs_only_missing_fields(generator):
+    first = {key: value for key, value in QUESTION.items() if key != "Explanations"}
+    repair = {"Explanations": QUESTION["Explanations"], "Question": "سؤال آخر؟"}
+    prompts = script_responses(generator, [json.dumps(first, ensure_ascii=False), json.dumps(repair, ensure_ascii=False)])
+
+    question = generator._generate_structured(2, "food", "")
+    # Fields that were already valid are kept over the repair's values
+    assert question == QUESTION
+    assert list(question) == list(QUESTION)
+    assert '"Explanations"' in prompts[1] and '"CorrectAnswer": "' not in prompts[1]
+
+    stats = generator.get_generation_stats()
+    assert (stats["bedrock_calls"], stats["repairs"], stats["questions"], stats["failures"]) == (2, 1, 1, 0)
+    assert stats["calls_per_question"] == 2
+
+def test_structured_generation_gives_up_after_max_repairs(generator):
+    incomplete = json.dumps({"Introduction": QUESTION["Introduction"]}, ensure_ascii=False)
+    script_responses(generator, [incomplete, "not json", "{}"])
+    assert generator._generate_structured(2, "food", "") is None
+
+    stats = generator.get_generation_stats()
+    assert (stats["bedrock_calls"], stats["repairs"], stats["questions"], stats["failures"]) == (3, 2, 0, 1)
+
+def test_structured_generation_fails_without_a_response(generator):
+    script_responses(generator, [])
+    assert generator._generate_structured(3, "work", "") is None
+    assert generator.get_generation_stats()["failures"] == 1
+
+def test_grade_answer_uses_the_stored_answer_key():
+    assert grade_answer(QUESTION, 2) == {
+        "correct": True, "explanation": "Correct, she wants coffee.", "correct_answer": 2
+    }
+    wrong = grade_answer(QUESTION, 3)
+    assert not wrong["correct"] and wrong["correct_answer"] == 2
+    assert wrong["explanation"] == "Water is not mentioned. Option 2: Correct, she wants coffee."
+
+def test_grade_answer_without_a_usable_key():
+    assert grade_answer(without_answer_key(QUESTION), 2) is None
+    assert grade_answer({**QUESTION, "CorrectAnswer": 7}, 2) is None
+    graded = grade_answer({**QUESTION, "Explanations": []}, 1)
+    assert graded["explanation"] == "The correct answer is option 2."
+
+def test_without_answer_key_keeps_the_question():
+    assert without_answer_key(QUESTION) == {
+        key: value for key, value in QUESTION.items() if key not in ("CorrectAnswer", "Explanations")
+    }
+
+def test_feedback_is_graded_locally(generator):
+    prompts = script_responses(generator, [])
+    assert generator.get_feedback(QUESTION, 1)["correct"] is False
+    assert prompts == []
+
+def test_extended_feedback_keeps_the_stored_answer(generator):
+    prompts = script_responses(generator, ['{"correct": true, "explanation": "More detail", "correct_answer": 1}'])
+    feedback = generator.get_feedback(QUESTION, 1, extended=True)
+    assert (feedback["correct"], feedback["correct_answer"]) == (False, 2)
+    assert feedback["extended_explanation"] == "More detail"
+    assert "Correct Answer: 2" in prompts[0]
+
+def test_feedback_without_an_answer_key_asks_the_model(generator):
+    script_responses(generator, ['{"correct": true, "explanation": "ok", "correct_answer": 2}'])
+    assert generator.get_feedback(without_answer_key(QUESTION), 2)["correct"] is True
+    script_responses(generator, ["not json"])
+    assert generator.get_feedback(without_answer_key(QUESTION), 2)["correct_answer"] is None
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from backend.question_index import InMemoryQuestionIndex, max_marginal_relevance
+
+def test_mmr_pure_relevance_orders_by_similarity():
+    candidates = [[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]]
+    assert max_marginal_relevance([1.0, 0.0], candidates, k=3, lambda_mult=1.0) == [0, 1, 2]
+
+def test_mmr_skips_near_duplicates():
+    # The second candidate repeats the first, the third is less relevant but new
+    candidates = [[1.0, 0.0], [1.0, 0.01], [0.6, 0.8]]
+    assert max_marginal_relevance([1.0, 0.0], candidates, k=2, lambda_mult=0.3) == [0, 2]
+
+def test_mmr_handles_edge_cases():
+    assert max_marginal_relevance([1.0, 0.0], [], k=3) == []
+    assert max_marginal_relevance([1.0, 0.0], [[1.0, 0.0]], k=0) == []
+    assert sorted(max_marginal_relevance([1.0, 0.0], [[1.0, 0.0], [0.0, 0.0]], k=5)) == [0, 1]
+    assert max_marginal_relevance([0.0, 0.0], [[1.0, 0.0], [0.0, 1.0]], k=1) in ([0], [1])
+
+def make_index():
+    index = InMemoryQuestionIndex()
+    index.build(
+        ["a", "b", "c"],
+        [[0.0, 0.0], [1.0, 0.0], [5.0, 5.0]],
+        [{"section": 2, "video_id": "v1"}, {"section": 2, "video_id": "v2"}, {"section": 3, "video_id": "v1"}],
+        [{"Question": "a"}, {"Question": "b"}, {"Question": "c"}]
+    )
+    return index
+
+def test_search_returns_squared_l2_nearest_first():
+    results = make_index().search([0.9, 0.0], n_results=2)
+    assert [question_id for question_id, _, _ in results] == ["b", "a"]
+    assert np.isclose(results[0][2], 0.01)
+    assert np.isclose(results[1][2], 0.81)
+
+def test_search_prefilters_on_metadata():
+    index = make_index()
+    assert [hit[0] for hit in index.search([5.0, 5.0], n_results=3, where={"section": 2})] == ["b", "a"]
+    assert [hit[0] for hit in index.search([0.0, 0.0], where={"video_id": ["v2"]})] == ["b"]
+    assert index.search([0.0, 0.0], where={"section": 4}) == []
+
+def test_upsert_and_remove_keep_ids_aligned():
+    index = make_index()
+    index.upsert(["b", "d"], [[9.0, 9.0], [1.0, 1.0]], [{"section": 2}, {"section": 2}], [{"Question": "b2"}, {"Question": "d"}])
+    assert len(index) == 4
+    assert index.get("b") == {"Question": "b2"}
+    assert index.get_embeddings(["d", "b"]).tolist() == [[1.0, 1.0], [9.0, 9.0]]
+
+    index.remove(["a", "missing"])
+    assert index.get("a") is None
+    assert index.search([1.0, 1.0], n_results=1)[0][0] == "d"
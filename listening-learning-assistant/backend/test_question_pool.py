@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+
+from backend.question_pool import QuestionPool
+from backend.rate_limit import TokenBucket
+
+class FakeGenerator:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_similar_question(self, section_num, topic):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if self.fail:
+            raise RuntimeError("generation failed")
+        return {"Question": f"{topic} {call}", "section": section_num}
+
+    def get_generation_stats(self):
+        return {"calls": self.calls}
+
+def make_pool(generator, keys=((2, "travel"),), **kwargs):
+    options = {"target_size": 3, "low_water": 1, "max_concurrency": 2, "miss_wait_seconds": 0}
+    options.update(kwargs)
+    return QuestionPool(generator, keys, rate_limiter=TokenBucket(1000), **options)
+
+def ready(pool, key="2:travel"):
+    return pool.stats()["pools"].get(key, {}).get("ready", 0)
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+def test_start_fills_pools_to_target_size():
+    generator = FakeGenerator()
+    pool = make_pool(generator, keys=[(2, "travel"), (3, "food")])
+    pool.start()
+    try:
+        assert wait_until(lambda: ready(pool) == 3 and ready(pool, "3:food") == 3)
+        time.sleep(0.1)
+        # Full pools are not topped up further
+        assert generator.calls == 6
+    finally:
+        pool.stop()
+
+def test_refill_starts_at_low_water():
+    generator = FakeGenerator()
+    pool = make_pool(generator)
+    pool.start()
+    try:
+        assert wait_until(lambda: ready(pool) == 3)
+        assert pool.get(2, "travel") is not None
+        time.sleep(0.1)
+        assert ready(pool) == 2 and generator.calls == 3
+
+        assert pool.get(2, "travel") is not None
+        assert wait_until(lambda: ready(pool) == 3)
+        assert generator.calls == 5
+
+        stats = pool.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 0, 1.0)
+        assert stats["generation"] == {"calls": 5}
+    finally:
+        pool.stop()
+
+def test_miss_generates_directly_and_registers_the_pool():
+    generator = FakeGenerator()
+    pool = make_pool(generator, keys=())
+    question = pool.get(3, "work")
+    assert question == {"Question": "work 1", "section": 3}
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+    assert "3:work" in stats["pools"]
+
+def test_stopped_pool_can_be_restarted():
+    generator = FakeGenerator()
+    pool = make_pool(generator)
+    pool.start()
+    assert wait_until(lambda: ready(pool) == 3)
+    pool.stop()
+
+    pool.get(2, "travel")
+    pool.get(2, "travel")
+    time.sleep(0.1)
+    assert ready(pool) == 1
+
+    pool.start()
+    try:
+        assert wait_until(lambda: ready(pool) == 3)
+    finally:
+        pool.stop()
+
+def test_failing_topic_backs_off():
+    generator = FakeGenerator(fail=True)
+    pool = make_pool(generator, max_concurrency=1)
+    pool.start()
+    try:
+        assert wait_until(lambda: generator.calls >= 1)
+        time.sleep(0.3)
+        # One failure schedules the next attempt two seconds later
+        assert generator.calls == 1
+        assert ready(pool) == 0
+        assert pool.stats()["pools"]["2:travel"]["inflight"] == 0
+    finally:
+        pool.stop()
@@ -2,136 +2,717 @@ import chromadb
 from chromadb.utils import embedding_functions
 import json
 import os
-import boto3
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from backend.bedrock_client import get_bedrock_client
+from backend.embedding_cache import EmbeddingCache
+from backend.embedding_queue import EmbeddingRetryQueue
+from backend.hashing_embedding import hash_embedding
+from backend.index_manifest import IndexManifest, question_fingerprint
+from backend.question_index import InMemoryQuestionIndex, max_marginal_relevance
+from backend.question_store import QuestionBodyStore
 
-class BedrockEmbeddingFunction(embedding_functions.EmbeddingFunction):
-    def __init__(self, model_id="amazon.titan-embed-text-v1"):
-        """Initialize Bedrock embedding function"""
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name="us-east-1")
-        self.model_id = model_id
+def parse_questions_file(filename: str) -> Optional[List[Dict]]:
+    """
+    Parse questions from a structured text file.
+    Returns None if the file could not be read, so callers can tell an unreadable
+    or half-written file from one that really has no questions.
+    Defined at module level so it can run in a process pool.
+    """
+    questions = []
+    current_question = {}
+    in_question = False
+    
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+            
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            
+            if line.startswith('<question>'):
+                current_question = {}
+                in_question = True
+            elif line.startswith('Introduction:'):
+                i += 1
+                if i < len(lines):
+                    current_question['Introduction'] = lines[i].strip()
+            elif line.startswith('Conversation:'):
+                i += 1
+                if i < len(lines):
+                    current_question['Conversation'] = lines[i].strip()
+            elif line.startswith('Situation:'):
+                i += 1
+                if i < len(lines):
+                    current_question['Situation'] = lines[i].strip()
+            elif line.startswith('Question:'):
+                i += 1
+                if i < len(lines):
+                    current_question['Question'] = lines[i].strip()
+            elif line.startswith('Options:'):
+                options = []
+                for _ in range(4):
+                    i += 1
+                    if i < len(lines):
+                        option = lines[i].strip()
+                        if option.startswith('1.') or option.startswith('2.') or option.startswith('3.') or option.startswith('4.'):
+                            options.append(option[2:].strip())
+                current_question['Options'] = options
+            elif line.startswith('</question>'):
+                in_question = False
+                if current_question:
+                    questions.append(current_question)
+                    current_question = {}
+            i += 1
+        if in_question:
+            print(f"Error parsing questions from {filename}: ends inside a question, it may still be being written")
+            return None
+        return questions
+    except Exception as e:
+        print(f"Error parsing questions from {filename}: {str(e)}")
+        return None
 
-    def __call__(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts using Bedrock"""
-        embeddings = []
-        for text in texts:
-            try:
-                response = self.bedrock_client.invoke_model(
-                    modelId=self.model_id,
-                    body=json.dumps({
-                        "inputText": text
-                    })
+class EmbeddingError(Exception):
+    """Raised when texts could not be embedded after every retry"""
+
+class EmbeddingBackend(embedding_functions.EmbeddingFunction):
+    """
+    Base class for embedding backends used by the vector store.
+    Subclasses set model_id and implement _embed_text; caching, failure
+    handling and the Chroma call interface are shared.
+    """
+    model_id = None
+    cache = None
+
+    def _embed_text(self, text: str) -> List[float]:
+        """Embed a single text, raising on failure"""
+        raise NotImplementedError
+
+    def _embed_or_none(self, text: str) -> Optional[List[float]]:
+        """Embed a single text, returning None if every attempt fails"""
+        try:
+            return self._embed_text(text)
+        except Exception as e:
+            print(f"Error generating embedding: {str(e)}")
+            return None
+
+    def _embed_uncached(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed texts that were not found in the cache, preserving input order"""
+        return [self._embed_or_none(text) for text in texts]
+
+    def embed_documents(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Generate embeddings for a list of texts, with None for each text that failed
+
+        Results are returned in the same order as the input texts.
+        """
+        if self.cache is None:
+            embeddings = self._embed_uncached(texts)
+        else:
+            embeddings = self.cache.get_many(self.model_id, texts)
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                fresh = self._embed_uncached([texts[i] for i in missing])
+                for i, embedding in zip(missing, fresh):
+                    embeddings[i] = embedding
+                # Only real vectors are cached, failures are retried on the next call
+                stored = [(texts[i], embedding) for i, embedding in zip(missing, fresh) if embedding is not None]
+                self.cache.put_many(
+                    self.model_id,
+                    [text for text, _ in stored],
+                    [embedding for _, embedding in stored]
                 )
-                response_body = json.loads(response['body'].read())
-                embedding = response_body['embedding']
-                embeddings.append(embedding)
-            except Exception as e:
-                print(f"Error generating embedding: {str(e)}")
-                # Return a zero vector as fallback
-                embeddings.append([0.0] * 1536)  # Titan model uses 1536 dimensions
         return embeddings
 
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for a list of texts
+
+        Raises EmbeddingError instead of returning placeholder vectors, so a
+        failed text is never indexed or searched with a meaningless embedding.
+        """
+        embeddings = self.embed_documents(texts)
+        failed = sum(1 for embedding in embeddings if embedding is None)
+        if failed:
+            raise EmbeddingError(f"Failed to embed {failed} of {len(texts)} texts")
+        return embeddings
+
+class BedrockEmbeddingFunction(EmbeddingBackend):
+    def __init__(
+        self,
+        model_id: str = "amazon.titan-embed-text-v1",
+        max_workers: int = 8,
+        cache: Optional[EmbeddingCache] = None
+    ):
+        """Initialize Bedrock embedding function
+
+        Titan has no batch endpoint, so a batch of texts is embedded through a
+        bounded pool of worker threads sharing one client, which retries
+        throttling and server errors. Texts found in the optional cache never reach Bedrock.
+        """
+        self.model_id = model_id
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        # The shared client's connection pool is sized for the widest worker pool
+        self.bedrock_client = get_bedrock_client()
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the worker pool shared by every batch"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="bedrock-embed"
+            )
+        return self._executor
+
+    def _embed_text(self, text: str) -> List[float]:
+        """Embed a single text"""
+        response_body = self.bedrock_client.invoke_model_json(self.model_id, {
+            "inputText": text
+        })
+        return response_body['embedding']
+
+    def _embed_uncached(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed texts through the worker pool, preserving input order"""
+        if len(texts) <= 1 or self.max_workers == 1:
+            return [self._embed_or_none(text) for text in texts]
+        return list(self._get_executor().map(self._embed_or_none, texts))
+
+class HashingEmbeddingFunction(EmbeddingBackend):
+    def __init__(self, dimensions: int = 512, ngram_range: Tuple[int, int] = (2, 4)):
+        """Initialize a local, deterministic character n-gram hashing embedder
+
+        Needs no network or model download, which makes it suitable for offline
+        development, benchmarks and CI.
+        """
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        self.model_id = f"local-hashing-{dimensions}-{ngram_range[0]}-{ngram_range[1]}"
+
+    def _embed_text(self, text: str) -> List[float]:
+        """Hash word-bounded character n-grams into a signed, L2-normalized vector"""
+        return hash_embedding(text, self.dimensions, self.ngram_range)
+
+class SentenceTransformerEmbeddingFunction(EmbeddingBackend):
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        cache: Optional[EmbeddingCache] = None
+    ):
+        """Initialize a local multilingual sentence-transformer running on the CPU"""
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "The sentence-transformers backend requires the sentence-transformers package: "
+                "pip install sentence-transformers"
+            )
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.model_id = model_name
+        self.cache = cache
+
+    def _embed_text(self, text: str) -> List[float]:
+        """Embed a single text"""
+        return self._embed_uncached([text])[0]
+
+    def _embed_uncached(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Encode all texts in one model batch"""
+        try:
+            vectors = self.model.encode(texts, normalize_embeddings=True)
+            return [vector.tolist() for vector in vectors]
+        except Exception as e:
+            print(f"Error generating embedding: {str(e)}")
+            return [None] * len(texts)
+
+EMBEDDING_BACKENDS = ("bedrock", "hashing", "sentence-transformers")
+
+def get_embedding_function(
+    backend: Optional[str] = None,
+    cache: Optional[EmbeddingCache] = None,
+    max_workers: int = 8
+) -> EmbeddingBackend:
+    """
+    Create the embedding backend selected by name or by the EMBEDDING_BACKEND
+    environment variable, defaulting to Bedrock.
+    """
+    backend = backend or os.environ.get("EMBEDDING_BACKEND", "bedrock")
+    if backend == "bedrock":
+        return BedrockEmbeddingFunction(max_workers=max_workers, cache=cache)
+    if backend == "hashing":
+        # Hashing is cheaper than a cache lookup, so it bypasses the cache
+        return HashingEmbeddingFunction()
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbeddingFunction(cache=cache)
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {', '.join(EMBEDDING_BACKENDS)}")
+
 class QuestionVectorStore:
-    def __init__(self, persist_directory: str = "backend/data/vectorstore"):
-        """Initialize the vector store for Arabic listening questions"""
+    def __init__(
+        self,
+        persist_directory: str = "backend/data/vectorstore",
+        embedding_workers: int = 8,
+        embedding_cache_size: int = 100000,
+        embedding_backend: Optional[str] = None,
+        use_memory_index: bool = False
+    ):
+        """
+        Initialize the vector store for Arabic listening questions.
+        With use_memory_index, reads are served from an in-process index
+        rebuilt from the persistent collections at startup.
+        """
         self.persist_directory = persist_directory
         
+        # Vectors from different backends have different dimensions, so every
+        # backend other than the original Bedrock one gets its own collections and manifests
+        self.embedding_backend = embedding_backend or os.environ.get("EMBEDDING_BACKEND", "bedrock")
+        suffix = "" if self.embedding_backend == "bedrock" else f"_{self.embedding_backend}"
+        
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(path=persist_directory)
         
-        # Use Bedrock's Titan embedding model
-        self.embedding_fn = BedrockEmbeddingFunction()
+        # Cache embeddings on disk so repeated documents and topic queries skip Bedrock
+        self.embedding_cache = EmbeddingCache(
+            os.path.join(persist_directory, "embedding_cache.sqlite3"),
+            max_entries=embedding_cache_size
+        )
+        
+        # Use Bedrock's Titan embedding model unless a local backend is configured
+        self.embedding_fn = get_embedding_function(
+            self.embedding_backend,
+            cache=self.embedding_cache,
+            max_workers=embedding_workers
+        )
+        
+        # Documents whose embedding failed wait here instead of being indexed
+        self.retry_queue = EmbeddingRetryQueue(
+            os.path.join(persist_directory, f"embedding_retry_queue{suffix}.sqlite3")
+        )
+        
+        # Content hashes of indexed questions, used to skip unchanged ones on re-index
+        self.manifest = IndexManifest(
+            os.path.join(persist_directory, f"index_manifest{suffix}.sqlite3")
+        )
+        
+        # Full question bodies live outside Chroma, which only keeps ids and filterable fields
+        self.question_bodies = QuestionBodyStore(
+            os.path.join(persist_directory, f"questions{suffix}.sqlite3")
+        )
         
         # Create or get collections for each section type
         self.collections = {
             "section2": self.client.get_or_create_collection(
-                name="section2_questions",
+                name=f"section2_questions{suffix}",
                 embedding_function=self.embedding_fn,
                 metadata={"description": "Arabic listening comprehension questions - Section 2"}
             ),
             "section3": self.client.get_or_create_collection(
-                name="section3_questions",
+                name=f"section3_questions{suffix}",
                 embedding_function=self.embedding_fn,
                 metadata={"description": "Arabic phrase matching questions - Section 3"}
             )
         }
+        
+        self.memory_indexes = {}
+        if use_memory_index:
+            self.rebuild_memory_index()
 
-    def add_questions(self, section_num: int, questions: List[Dict], video_id: str):
-        """Add questions to the vector store"""
-        if section_num not in [2, 3]:
-            raise ValueError("Only sections 2 and 3 are currently supported")
+    def rebuild_memory_index(self, page_size: int = 5000):
+        """Load every stored vector and decoded question into the in-process index"""
+        for section_num in [2, 3]:
+            collection = self.collections[f"section{section_num}"]
+            ids, embeddings, metadatas = [], [], []
+            offset = 0
+            while True:
+                page = collection.get(include=['embeddings', 'metadatas'], limit=page_size, offset=offset)
+                if not len(page['ids']):
+                    break
+                ids.extend(page['ids'])
+                embeddings.extend(page['embeddings'])
+                metadatas.extend(page['metadatas'])
+                offset += len(page['ids'])
             
+            index = InMemoryQuestionIndex()
+            index.build(ids, embeddings, metadatas, self._load_questions(section_num, ids, metadatas))
+            self.memory_indexes[section_num] = index
+            print(f"Loaded {len(index)} section {section_num} questions into the memory index")
+
+    def count_legacy_entries(self, section_num: int, page_size: int = 5000) -> int:
+        """Count entries that still carry their body in a full_structure metadata blob"""
         collection = self.collections[f"section{section_num}"]
+        count, offset = 0, 0
+        while True:
+            page = collection.get(include=['metadatas'], limit=page_size, offset=offset)
+            if not len(page['ids']):
+                return count
+            count += sum(1 for metadata in page['metadatas'] if metadata and 'full_structure' in metadata)
+            offset += len(page['ids'])
+
+    @staticmethod
+    def make_question_id(video_id: str, section_num: int, idx: int) -> str:
+        """Build the id a question is stored under"""
+        return f"{video_id}_{section_num}_{idx}"
+
+    def add_questions(self, section_num: int, questions: List[Dict], video_id: str) -> Dict[str, int]:
+        """
+        Add questions to the vector store.
+        Questions whose content is unchanged since they were last indexed are skipped.
+        """
+        return self.add_question_batches(section_num, [(video_id, questions)])
+
+    def add_question_batches(
+        self,
+        section_num: int,
+        batches: List[Tuple[str, List[Dict]]],
+        chunk_size: int = 256,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Add questions from many videos at once.
+        New or changed questions are embedded and written in chunks of chunk_size,
+        so each chunk is one concurrent embedding batch and one collection upsert.
+        progress is called with (done, total) after every chunk.
+        """
+        if section_num not in [2, 3]:
+            raise ValueError("Only sections 2 and 3 are currently supported")
         
         ids = []
         documents = []
         metadatas = []
+        fingerprints = []
+        bodies = []
         
-        for idx, question in enumerate(questions):
-            # Create a unique ID for each question
-            question_id = f"{video_id}_{section_num}_{idx}"
-            ids.append(question_id)
-            
-            # Store the full question structure as metadata
-            metadatas.append({
-                "video_id": video_id,
-                "section": section_num,
-                "question_index": idx,
-                "full_structure": json.dumps(question)
-            })
-            
-            # Create a searchable document from the question content
-            if section_num == 2:
-                document = f"""
-                Situation: {question['Introduction']}
-                Dialogue: {question['Conversation']}
-                Question: {question['Question']}
-                """
-            else:  # section 3
-                document = f"""
-                Situation: {question['Situation']}
-                Question: {question['Question']}
-                """
-            documents.append(document)
-        
-        # Add to collection
-        collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
+        for video_id, questions in batches:
+            for idx, question in enumerate(questions):
+                # Create a unique ID for each question
+                question_id = self.make_question_id(video_id, section_num, idx)
+                ids.append(question_id)
+                fingerprints.append(question_fingerprint(question))
+                bodies.append(question)
+                
+                # Only filterable fields go into Chroma, the body goes to the side store
+                metadata = {
+                    "video_id": video_id,
+                    "section": section_num,
+                    "question_index": idx
+                }
+                if question.get('topic'):
+                    metadata["topic"] = question['topic']
+                metadatas.append(metadata)
+                
+                # Create a searchable document from the question content
+                if section_num == 2:
+                    document = f"""
+                    Situation: {question['Introduction']}
+                    Dialogue: {question['Conversation']}
+                    Question: {question['Question']}
+                    """
+                else:  # section 3
+                    document = f"""
+                    Situation: {question['Situation']}
+                    Question: {question['Question']}
+                    """
+                documents.append(document)
+        
+        known = self.manifest.get_fingerprints(section_num, ids)
+        changed = [i for i, question_id in enumerate(ids) if known.get(question_id) != fingerprints[i]]
+        
+        indexed = 0
+        for start in range(0, len(changed), chunk_size):
+            chunk = changed[start:start + chunk_size]
+            self.question_bodies.put_many(section_num, {ids[i]: bodies[i] for i in chunk})
+            indexed += self._add_embedded(
+                section_num,
+                [ids[i] for i in chunk],
+                [documents[i] for i in chunk],
+                [metadatas[i] for i in chunk]
+            )
+            # Queued questions are recorded too, the retry queue already holds their new content
+            by_video = {}
+            for i in chunk:
+                by_video.setdefault(metadatas[i]["video_id"], {})[ids[i]] = fingerprints[i]
+            for video_id, video_fingerprints in by_video.items():
+                self.manifest.set_many(section_num, video_id, video_fingerprints)
+            if progress:
+                progress(start + len(chunk), len(changed))
+        
+        return {
+            "indexed": indexed,
+            "queued": len(changed) - indexed,
+            "unchanged": len(ids) - len(changed)
+        }
+
+    def remove_stale_questions(self, section_num: int, video_id: str, keep_ids: List[str]) -> int:
+        """Delete a video's indexed questions that are not in keep_ids. Returns the number removed."""
+        keep = set(keep_ids)
+        stale = [
+            question_id for question_id in self.manifest.get_video_question_ids(section_num, video_id)
+            if question_id not in keep
+        ]
+        if stale:
+            self.collections[f"section{section_num}"].delete(ids=stale)
+            self.retry_queue.remove_many(section_num, stale)
+            self.manifest.remove_many(section_num, stale)
+            self.question_bodies.remove_many(section_num, stale)
+            if section_num in self.memory_indexes:
+                self.memory_indexes[section_num].remove(stale)
+        return len(stale)
+
+    def _add_embedded(self, section_num: int, ids: List[str], documents: List[str], metadatas: List[Dict]) -> int:
+        """
+        Embed documents and add the successful ones to the collection.
+        Failed documents go to the retry queue. Returns the number indexed.
+        """
+        collection = self.collections[f"section{section_num}"]
+        embeddings = self.embedding_fn.embed_documents(documents)
+        
+        ok = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        failed = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if ok:
+            # Replace changed questions' previous entries. Upsert would merge metadata and
+            # keep the body blob and document of entries written in the old layout, so
+            # delete and re-add; the manifest is only updated afterwards, so an
+            # interrupted run re-indexes these ids. The document text is only needed
+            # for embedding, so it is not stored in Chroma.
+            collection.delete(ids=[ids[i] for i in ok])
+            collection.add(
+                ids=[ids[i] for i in ok],
+                metadatas=[metadatas[i] for i in ok],
+                embeddings=[embeddings[i] for i in ok]
+            )
+            self.retry_queue.remove_many(section_num, [ids[i] for i in ok])
+            if section_num in self.memory_indexes:
+                self.memory_indexes[section_num].upsert(
+                    [ids[i] for i in ok],
+                    [embeddings[i] for i in ok],
+                    [metadatas[i] for i in ok],
+                    self._load_questions(section_num, [ids[i] for i in ok], [metadatas[i] for i in ok])
+                )
+        
+        if failed:
+            # Keep stale versions of changed questions out of search results until re-embedded
+            collection.delete(ids=[ids[i] for i in failed])
+            if section_num in self.memory_indexes:
+                self.memory_indexes[section_num].remove([ids[i] for i in failed])
+            self.retry_queue.enqueue_many(
+                section_num,
+                [{"id": ids[i], "document": documents[i], "metadata": metadatas[i]} for i in failed],
+                error="embedding failed"
+            )
+            print(f"Queued {len(failed)} questions for re-embedding in section {section_num}")
+        
+        return len(ok)
+
+    def drain_retry_queue(self, batch_size: int = 64) -> Dict[str, int]:
+        """Re-embed queued documents in bulk and index the ones that succeed"""
+        stats = {"indexed": 0, "failed": 0}
+        for section_num in [2, 3]:
+            pending = self.retry_queue.pending(section_num)
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                indexed = self._add_embedded(
+                    section_num,
+                    [item['id'] for item in batch],
+                    [item['document'] for item in batch],
+                    [item['metadata'] for item in batch]
+                )
+                stats["indexed"] += indexed
+                stats["failed"] += len(batch) - indexed
+        return stats
+
+    def start_background_drain(self, interval_seconds: float = 60.0) -> threading.Event:
+        """
+        Drain the retry queue periodically on a daemon thread.
+        Set the returned event to stop the thread.
+        """
+        stop_event = threading.Event()
+        
+        def _drain_loop():
+            while not stop_event.wait(interval_seconds):
+                if self.retry_queue.count():
+                    stats = self.drain_retry_queue()
+                    print(f"Retry queue drained: {stats['indexed']} indexed, {stats['failed']} still pending")
+        
+        threading.Thread(target=_drain_loop, name="embedding-retry-drain", daemon=True).start()
+        return stop_event
 
     def search_similar_questions(
         self, 
         section_num: int, 
         query: str, 
-        n_results: int = 5
+        n_results: int = 5,
+        where: Optional[Dict] = None
     ) -> List[Dict]:
-        """Search for similar questions in the vector store"""
+        """
+        Search for similar questions in the vector store.
+        where prefilters on metadata, e.g. {"video_id": "abc"} or {"topic": ["Shopping", "Travel"]}.
+        """
         if section_num not in [2, 3]:
             raise ValueError("Only sections 2 and 3 are currently supported")
             
         collection = self.collections[f"section{section_num}"]
         
+        try:
+            query_embeddings = self.embedding_fn([query])
+        except EmbeddingError as e:
+            print(f"Error embedding search query: {str(e)}")
+            return []
+        
+        if section_num in self.memory_indexes:
+            questions = []
+            for _, question_data, distance in self.memory_indexes[section_num].search(
+                query_embeddings[0], n_results, where
+            ):
+                question_data['similarity_score'] = distance
+                questions.append(question_data)
+            return questions
+        
         results = collection.query(
-            query_texts=[query],
-            n_results=n_results
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=self._to_chroma_where(where)
         )
         
         # Convert results to more usable format
         questions = []
-        for idx, metadata in enumerate(results['metadatas'][0]):
-            question_data = json.loads(metadata['full_structure'])
+        loaded = self._load_questions(section_num, results['ids'][0], results['metadatas'][0])
+        for idx, question_data in enumerate(loaded):
+            if question_data is None:
+                continue
             question_data['similarity_score'] = results['distances'][0][idx]
             questions.append(question_data)
             
         return questions
 
+    def search_similar_questions_batch(
+        self,
+        section_num: int,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        dedupe: bool = False,
+        mmr: bool = False,
+        fetch_k: Optional[int] = None,
+        lambda_mult: float = 0.5
+    ) -> List[List[Dict]]:
+        """
+        Search for similar questions for many queries at once.
+        All queries are embedded in one batch and sent in one collection query.
+        
+        Args:
+            dedupe: never return the same question for two queries; earlier queries win
+            mmr: diversify each query's results with max marginal relevance
+            fetch_k: candidates fetched per query before dedupe/MMR (default 4 * n_results)
+            lambda_mult: MMR trade-off, 1 is pure relevance and 0 is pure diversity
+            
+        Returns:
+            List[List[Dict]]: one result list per query, in query order
+        """
+        if section_num not in [2, 3]:
+            raise ValueError("Only sections 2 and 3 are currently supported")
+        if not queries:
+            return []
+        
+        collection = self.collections[f"section{section_num}"]
+        if fetch_k is None:
+            fetch_k = n_results * 4 if (dedupe or mmr) else n_results
+        fetch_k = max(fetch_k, n_results)
+        
+        # Queries that fail to embed get no results instead of failing the whole batch
+        query_embeddings = self.embedding_fn.embed_documents(queries)
+        embedded = [i for i, embedding in enumerate(query_embeddings) if embedding is not None]
+        for i in range(len(queries)):
+            if query_embeddings[i] is None:
+                print(f"Error embedding search query: {queries[i]}")
+        
+        # Gather (id, question, distance, embedding) candidates per query
+        candidates = {i: [] for i in range(len(queries))}
+        if section_num in self.memory_indexes:
+            index = self.memory_indexes[section_num]
+            for i in embedded:
+                hits = index.search(query_embeddings[i], fetch_k, where)
+                vectors = index.get_embeddings([hit[0] for hit in hits]) if mmr and hits else [None] * len(hits)
+                candidates[i] = [(*hit, vector) for hit, vector in zip(hits, vectors)]
+        elif embedded:
+            include = ['metadatas', 'distances'] + (['embeddings'] if mmr else [])
+            results = collection.query(
+                query_embeddings=[query_embeddings[i] for i in embedded],
+                n_results=fetch_k,
+                where=self._to_chroma_where(where),
+                include=include
+            )
+            for row, i in enumerate(embedded):
+                loaded = self._load_questions(section_num, results['ids'][row], results['metadatas'][row])
+                for idx, question_data in enumerate(loaded):
+                    if question_data is None:
+                        continue
+                    candidates[i].append((
+                        results['ids'][row][idx],
+                        question_data,
+                        results['distances'][row][idx],
+                        results['embeddings'][row][idx] if mmr else None
+                    ))
+        
+        seen = set()
+        all_results = []
+        for i in range(len(queries)):
+            pool = [c for c in candidates[i] if not (dedupe and c[0] in seen)]
+            if mmr and pool:
+                order = max_marginal_relevance(
+                    query_embeddings[i], [c[3] for c in pool], n_results, lambda_mult
+                )
+                pool = [pool[j] for j in order]
+            questions = []
+            for question_id, question_data, distance, _ in pool[:n_results]:
+                question_data['similarity_score'] = distance
+                questions.append(question_data)
+                seen.add(question_id)
+            all_results.append(questions)
+        return all_results
+
+    def _load_questions(self, section_num: int, ids: List[str], metadatas: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Fetch question bodies for result ids in one side-store query.
+        Falls back to the JSON metadata blob of questions indexed before the side store existed.
+        """
+        bodies = self.question_bodies.get_many(section_num, list(ids))
+        questions = []
+        for question_id, metadata in zip(ids, metadatas):
+            question = bodies.get(question_id)
+            if question is None and metadata and 'full_structure' in metadata:
+                question = json.loads(metadata['full_structure'])
+            questions.append(question)
+        return questions
+
+    @staticmethod
+    def _to_chroma_where(where: Optional[Dict]) -> Optional[Dict]:
+        """Translate {field: value or [values]} filters into Chroma's where syntax"""
+        if not where:
+            return None
+        clauses = [
+            {field: {"$in": list(value)}} if isinstance(value, (list, tuple, set)) else {field: value}
+            for field, value in where.items()
+        ]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def get_embedding_cache_stats(self) -> Dict:
+        """Return embedding cache hit/miss counters"""
+        return self.embedding_cache.stats()
+
     def get_question_by_id(self, section_num: int, question_id: str) -> Optional[Dict]:
         """Retrieve a specific question by its ID"""
         if section_num not in [2, 3]:
             raise ValueError("Only sections 2 and 3 are currently supported")
             
+        if section_num in self.memory_indexes:
+            return self.memory_indexes[section_num].get(question_id)
+        
+        question = self.question_bodies.get(section_num, question_id)
+        if question is not None:
+            return question
+        
+        # Questions indexed before the side store existed keep their body in metadata
         collection = self.collections[f"section{section_num}"]
         
         result = collection.get(
@@ -139,59 +720,13 @@ class QuestionVectorStore:
             include=['metadatas']
         )
         
-        if result['metadatas']:
+        if result['metadatas'] and 'full_structure' in result['metadatas'][0]:
             return json.loads(result['metadatas'][0]['full_structure'])
         return None
 
-    def parse_questions_from_file(self, filename: str) -> List[Dict]:
-        """Parse questions from a structured text file"""
-        questions = []
-        current_question = {}
-        
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if line.startswith('<question>'):
-                    current_question = {}
-                elif line.startswith('Introduction:'):
-                    i += 1
-                    if i < len(lines):
-                        current_question['Introduction'] = lines[i].strip()
-                elif line.startswith('Conversation:'):
-                    i += 1
-                    if i < len(lines):
-                        current_question['Conversation'] = lines[i].strip()
-                elif line.startswith('Situation:'):
-                    i += 1
-                    if i < len(lines):
-                        current_question['Situation'] = lines[i].strip()
-                elif line.startswith('Question:'):
-                    i += 1
-                    if i < len(lines):
-                        current_question['Question'] = lines[i].strip()
-                elif line.startswith('Options:'):
-                    options = []
-                    for _ in range(4):
-                        i += 1
-                        if i < len(lines):
-                            option = lines[i].strip()
-                            if option.startswith('1.') or option.startswith('2.') or option.startswith('3.') or option.startswith('4.'):
-                                options.append(option[2:].strip())
-                    current_question['Options'] = options
-                elif line.startswith('</question>'):
-                    if current_question:
-                        questions.append(current_question)
-                        current_question = {}
-                i += 1
-            return questions
-        except Exception as e:
-            print(f"Error parsing questions from {filename}: {str(e)}")
-            return []
+    def parse_questions_from_file(self, filename: str) -> Optional[List[Dict]]:
+        """Parse questions from a structured text file; None if it could not be read"""
+        return parse_questions_file(filename)
 
     def index_questions_file(self, filename: str, section_num: int):
         """Index all questions from a file into the vector store"""
@@ -200,16 +735,49 @@ class QuestionVectorStore:
         
         # Parse questions from file
         questions = self.parse_questions_from_file(filename)
+        if questions is None:
+            # Keep what was indexed from the file until it can be read again
+            print(f"Skipping {filename}: could not be read")
+            return {"indexed": 0, "unchanged": 0, "queued": 0, "removed": 0}
         
-        # Add to vector store
+        # Add to vector store, only embedding new or changed questions
         if questions:
-            self.add_questions(section_num, questions, video_id)
-            print(f"Indexed {len(questions)} questions from {filename}")
+            stats = self.add_questions(section_num, questions, video_id)
+        else:
+            stats = {"indexed": 0, "unchanged": 0, "queued": 0}
+        # A file that no longer has questions still drops everything indexed from it before
+        keep_ids = [self.make_question_id(video_id, section_num, idx) for idx in range(len(questions))]
+        stats["removed"] = self.remove_stale_questions(section_num, video_id, keep_ids)
+        print(
+            f"Indexed {filename}: {stats['indexed']} embedded, {stats['unchanged']} unchanged, "
+            f"{stats['queued']} queued, {stats['removed']} removed"
+        )
+        return stats
 
 if __name__ == "__main__":
-    # Example usage
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Index and maintain the question vector store")
+    parser.add_argument("--drain-queue", action="store_true",
+                        help="re-embed questions waiting in the retry queue instead of indexing")
+    parser.add_argument("--drain-interval", type=float, default=0,
+                        help="keep draining every N seconds instead of exiting after one pass")
+    args = parser.parse_args()
+    
     store = QuestionVectorStore()
     
+    if args.drain_queue:
+        while True:
+            print(f"{store.retry_queue.count()} questions waiting for embeddings")
+            stats = store.drain_retry_queue()
+            print(f"Indexed {stats['indexed']} questions, {stats['failed']} still pending")
+            if args.drain_interval <= 0:
+                break
+            time.sleep(args.drain_interval)
+        raise SystemExit(0)
+    
+    # Example usage
+
     # Index questions from files
     question_files = [
         ("backend/data/questions/sY7L5cfCWno_section2.txt", 2),
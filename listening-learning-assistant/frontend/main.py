@@ -7,6 +7,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.question_generator import QuestionGenerator
 from backend.audio_generator import AudioGenerator
+from backend.audio_stream_server import AudioStreamServer
+from backend.json_file import update_json
+from backend.metrics import start_metrics_server
+from backend.question_pool import QuestionPool
+from backend.vector_store import QuestionVectorStore
 
 # Page config
 st.set_page_config(
@@ -15,6 +20,41 @@ st.set_page_config(
     layout="wide"
 )
 
+# Topics per practice type, and the question section each practice type draws from
+TOPICS = {
+    "Dialogue Practice": ["Daily Conversation", "Shopping", "Restaurant", "Travel", "School/Work"],
+    "Phrase Matching": ["Announcements", "Instructions", "Weather Reports", "News Updates"]
+}
+SECTIONS = {"Dialogue Practice": 2, "Phrase Matching": 3}
+
+@st.cache_resource
+def get_question_generator():
+    """
+    Build one generator per Streamlit process, shared by all sessions and the pool.
+    Its example lookups are served from an in-memory index, which is loaded once here.
+    """
+    return QuestionGenerator(vector_store=QuestionVectorStore(use_memory_index=True))
+
+@st.cache_resource
+def get_question_pool():
+    """
+    Start one pool of ready questions per Streamlit process, shared by all sessions.
+    Set METRICS_PORT to export its hit/miss and refill metrics to Prometheus.
+    """
+    if os.environ.get("METRICS_PORT"):
+        start_metrics_server(int(os.environ["METRICS_PORT"]))
+    pool = QuestionPool(
+        get_question_generator(),
+        keys=[(SECTIONS[practice_type], topic) for practice_type, topics in TOPICS.items() for topic in topics]
+    )
+    pool.start()
+    return pool
+
+@st.cache_resource
+def get_audio_stream_server():
+    """Start the progressive audio server once per Streamlit process"""
+    return AudioStreamServer()
+
 def load_stored_questions():
     """Load previously stored questions from JSON file"""
     questions_file = os.path.join(
@@ -33,9 +73,6 @@ def save_question(question, practice_type, topic, audio_file=None):
         "backend/data/stored_questions.json"
     )
     
-    # Load existing questions
-    stored_questions = load_stored_questions()
-    
     # Create a unique ID for the question using timestamp
     question_id = datetime.now().strftime("%Y%m%d_%H%M%S")
     
@@ -48,21 +85,35 @@ def save_question(question, practice_type, topic, audio_file=None):
         "audio_file": audio_file
     }
     
-    # Add to stored questions
-    stored_questions[question_id] = question_data
+    def add_question(stored_questions):
+        stored_questions[question_id] = question_data
+        return stored_questions
     
-    # Save back to file
-    os.makedirs(os.path.dirname(questions_file), exist_ok=True)
-    with open(questions_file, 'w', encoding='utf-8') as f:
-        json.dump(stored_questions, f, ensure_ascii=False, indent=2)
+    # Re-read and write under a lock shared with the audio pre-render job,
+    # so neither overwrites questions the other has just saved
+    update_json(questions_file, add_question)
     
     return question_id
 
+def render_pool_stats(stats):
+    """Show how often questions came ready from the pool and how long refills take"""
+    with st.expander("Question pool"):
+        st.write(f"Hit rate: {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['misses']} misses)")
+        refill = stats["refill"]
+        if refill:
+            st.write(f"Refills: {refill['count']} ({refill['errors']} failed), "
+                     f"p50 {refill['p50_ms'] / 1000:.1f} s, p95 {refill['p95_ms'] / 1000:.1f} s")
+        calls_per_question = stats["generation"]["calls_per_question"]
+        if calls_per_question:
+            st.write(f"Bedrock calls per question: {calls_per_question:.2f}")
+        for name, pool in stats["pools"].items():
+            st.write(f"{name}: {pool['ready']} ready, {pool['inflight']} generating")
+
 def render_interactive_stage():
     """Render the interactive learning stage"""
     # Initialize session state
     if 'question_generator' not in st.session_state:
-        st.session_state.question_generator = QuestionGenerator()
+        st.session_state.question_generator = get_question_generator()
     if 'audio_generator' not in st.session_state:
         st.session_state.audio_generator = AudioGenerator()
     if 'current_question' not in st.session_state:
@@ -75,6 +126,8 @@ def render_interactive_stage():
         st.session_state.current_topic = None
     if 'current_audio' not in st.session_state:
         st.session_state.current_audio = None
+    if 'current_audio_stream' not in st.session_state:
+        st.session_state.current_audio_stream = None
         
     # Load stored questions for sidebar
     stored_questions = load_stored_questions()
@@ -91,10 +144,13 @@ def render_interactive_stage():
                     st.session_state.current_practice_type = qdata['practice_type']
                     st.session_state.current_topic = qdata['topic']
                     st.session_state.current_audio = qdata.get('audio_file')
+                    st.session_state.current_audio_stream = None
                     st.session_state.feedback = None
                     st.rerun()
         else:
             st.info("No saved questions yet. Generate some questions to see them here!")
+
+        render_pool_stats(get_question_pool().stats())
     
     # Practice type selection
     practice_type = st.selectbox(
@@ -103,22 +159,16 @@ def render_interactive_stage():
     )
     
     # Topic selection
-    topics = {
-        "Dialogue Practice": ["Daily Conversation", "Shopping", "Restaurant", "Travel", "School/Work"],
-        "Phrase Matching": ["Announcements", "Instructions", "Weather Reports", "News Updates"]
-    }
-    
     topic = st.selectbox(
         "Select Topic",
-        topics[practice_type]
+        TOPICS[practice_type]
     )
     
     # Generate new question button
     if st.button("Generate New Question"):
-        section_num = 2 if practice_type == "Dialogue Practice" else 3
-        new_question = st.session_state.question_generator.generate_similar_question(
-            section_num, topic
-        )
+        section_num = SECTIONS[practice_type]
+        # Served from the pre-generated pool; only a cold pool waits on the LLM
+        new_question = get_question_pool().get(section_num, topic)
         st.session_state.current_question = new_question
         st.session_state.current_practice_type = practice_type
         st.session_state.current_topic = topic
@@ -127,6 +177,7 @@ def render_interactive_stage():
         # Save the generated question
         save_question(new_question, practice_type, topic)
         st.session_state.current_audio = None
+        st.session_state.current_audio_stream = None
     
     if st.session_state.current_question:
         st.subheader("Practice Scenario")
@@ -153,7 +204,7 @@ def render_interactive_stage():
             # If we have feedback, show which answers were correct/incorrect
             if st.session_state.feedback:
                 correct = st.session_state.feedback.get('correct', False)
-                correct_answer = st.session_state.feedback.get('correct_answer', 1) - 1
+                correct_answer = (st.session_state.feedback.get('correct_answer') or 0) - 1
                 selected_index = st.session_state.selected_answer - 1 if hasattr(st.session_state, 'selected_answer') else -1
                 
                 st.write("\n**Your Answer:**")
@@ -175,6 +226,19 @@ def render_interactive_stage():
                 else:
                     st.error(explanation)
                 
+                # Grading is local; the model is only asked when the learner wants more detail
+                extended_explanation = st.session_state.feedback.get('extended_explanation')
+                if extended_explanation:
+                    st.info(extended_explanation)
+                elif st.button("Explain in more detail"):
+                    with st.spinner("Getting a detailed explanation..."):
+                        st.session_state.feedback = st.session_state.question_generator.get_feedback(
+                            st.session_state.current_question,
+                            st.session_state.selected_answer,
+                            extended=True
+                        ) or st.session_state.feedback
+                    st.rerun()
+                
                 # Add button to try new question
                 if st.button("Try Another Question"):
                     st.session_state.feedback = None
@@ -200,45 +264,38 @@ def render_interactive_stage():
         
         with col2:
             st.subheader("Audio")
-            if st.session_state.current_audio:
+            if st.session_state.current_audio and os.path.exists(st.session_state.current_audio):
                 # Display audio player
                 st.audio(st.session_state.current_audio)
+            elif st.session_state.current_audio_stream:
+                # Play while later parts are still being synthesized
+                st.audio(st.session_state.current_audio_stream, format="audio/mpeg")
             elif st.session_state.current_question:
                 # Show generate audio button
                 if st.button("Generate Audio"):
-                    with st.spinner("Generating audio..."):
-                        try:
-                            # Clear any previous audio
-                            if st.session_state.current_audio and os.path.exists(st.session_state.current_audio):
-                                try:
-                                    os.unlink(st.session_state.current_audio)
-                                except Exception:
-                                    pass
-                            st.session_state.current_audio = None
-                            
-                            # Generate new audio
-                            audio_file = st.session_state.audio_generator.generate_audio(
-                                st.session_state.current_question
-                            )
-                            
-                            # Verify the audio file exists
-                            if not os.path.exists(audio_file):
-                                raise Exception("Audio file was not created")
-                                
-                            st.session_state.current_audio = audio_file
-                            
-                            # Update stored question with audio file
-                            save_question(
-                                st.session_state.current_question,
-                                st.session_state.current_practice_type,
-                                st.session_state.current_topic,
-                                audio_file
-                            )
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error generating audio: {str(e)}")
-                            # Clear the audio state on error
-                            st.session_state.current_audio = None
+                    try:
+                        audio_generator = st.session_state.audio_generator
+                        question = st.session_state.current_question
+                        
+                        practice_type = st.session_state.current_practice_type
+                        topic = st.session_state.current_topic
+                        
+                        # The player starts after the first synthesized part; the full
+                        # file lands at this path once the stream has finished
+                        audio_file = audio_generator.get_question_audio_path(question)
+                        st.session_state.current_audio_stream = get_audio_stream_server().register(
+                            audio_generator,
+                            question,
+                            # Update stored question with audio file only once it exists
+                            on_complete=lambda path: save_question(question, practice_type, topic, path)
+                        )
+                        st.session_state.current_audio = audio_file
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error generating audio: {str(e)}")
+                        # Clear the audio state on error
+                        st.session_state.current_audio = None
+                        st.session_state.current_audio_stream = None
             else:
                 st.info("Generate a question to create audio.")
     else: